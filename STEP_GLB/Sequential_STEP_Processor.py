@@ -5,19 +5,38 @@ Enhanced Sequential STEP File Processor with Reference BOM Extraction Logic
 Processes all files in folder sequentially with robust BOM extraction from reference file.
 """
 
+import io
 import json
 import sys
 import os.path
-import glob
 import logging
-import threading
-import queue
 import time
+import threading
 import gc
 import re
+import hashlib
+import itertools
+import math
+import errno
+import queue
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
+from functools import cached_property, lru_cache, partial
+
+try:
+    import orjson
+except ImportError:  # optional - fall back to stdlib json
+    orjson = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 # OCC imports from reference file
 from OCC.Core.IFSelect import IFSelect_RetDone
@@ -35,10 +54,53 @@ from OCC.Core.XCAFApp import XCAFApp_Application
 from OCC.Core.XCAFDoc import (XCAFDoc_DocumentTool_ShapeTool,
                               XCAFDoc_DocumentTool_ColorTool)
 
+from step_files import scan_step_files, terminate_executor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
 logger = logging.getLogger(__name__)
 
+# Scratch color reused by every getColor call; only read back immediately after GetColor
+_REUSABLE_COLOR = Quantity_Color()
+
+# Shared default color for components without one - returned by identity, never mutate it
+_DEFAULT_COLOR = {'r': 128, 'g': 128, 'b': 128, 'hex': '#808080'}
+
+# BOM worker processes are recycled after this many files to bound OCC memory growth
+BOM_WORKER_RECYCLE_EVERY = 10
+# GLB worker processes are used once; OCCT tessellation memory is only reliably freed at exit
+GLB_WORKER_RECYCLE_EVERY = 1
+# BOM extraction time limit in seconds; None waits as long as it takes. XCAF traversal of
+# large assemblies can outlast tessellation, so it does not share the GLB size tiers.
+BOM_TIMEOUT_SECONDS = None
+
+# Full gc.collect() runs every N files, or sooner once RSS grows by this many MB
+GC_EVERY_N_FILES = 10
+GC_RSS_GROWTH_MB = 512
+# How often in-flight files check whether the batch has been stopped
+STOP_POLL_SECONDS = 0.5
+# Read size for hashing STEP files where hashlib.file_digest is unavailable
+HASH_CHUNK_SIZE = 1024 * 1024
+# Opt-in scratch dir for GLB workers (e.g. STEP_GLB_SCRATCH_DIR=/dev/shm); a background
+# thread moves the finished file into the output tree. Off by default: a move across
+# filesystems copies every byte, and /dev/shm is only 64 MB in a default container.
+GLB_SCRATCH_DIR = os.environ.get("STEP_GLB_SCRATCH_DIR", "")
+
+# Report separators and headers, built once
+_SEP60 = "=" * 60
+_SEP40 = "-" * 40
+_SEP30 = "-" * 30
+_HDR_STEP1 = "\n📋 STEP 1: REFERENCE BOM EXTRACTION\n" + _SEP40
+_HDR_STEP2 = "\n🌐 STEP 2: GLB CONVERSION\n" + _SEP30
+_HEADER_LINES = "\n".join((
+    "🔄 ENHANCED SEQUENTIAL STEP FILE PROCESSOR",
+    "📝 Now using reference BOM extraction logic!",
+    "🏷️ All files saved with unique timestamps!",
+    "📁 Processing files in parallel",
+    _SEP60,
+))
+_HDR_SUMMARY = "\n".join(("", _SEP60, "🎉 ENHANCED SEQUENTIAL PROCESSING COMPLETE", _SEP60))
+
 @dataclass
 class WebAssetsData:
     """Data structure for web assets"""
@@ -57,11 +119,8 @@ class ProcessingResult:
     bom_output_file: Optional[str] = None
     bom_error: Optional[str] = None
     
-    glb_file: Optional[str] = None
+    web_assets: Optional[WebAssetsData] = None
     glb_file_path: Optional[str] = None
-    glb_file_size: int = 0
-    glb_format: str = ""
-    three_js_compatible: bool = False
     glb_error: Optional[str] = None
     
     filename: Optional[str] = None
@@ -71,6 +130,26 @@ class ProcessingResult:
     processing_duration: float = 0.0
     timeout_occurred: bool = False
     file_size_mb: float = 0.0
+    content_hash: Optional[str] = None
+    reused_outputs: bool = False
+    report: Optional[str] = None
+    
+    # GLB details are read through from web_assets rather than copied per file
+    @property
+    def glb_file(self):
+        return self.web_assets.glb_file if self.web_assets else None
+    
+    @property
+    def glb_file_size(self):
+        return self.web_assets.file_size if self.web_assets else 0
+    
+    @property
+    def glb_format(self):
+        return self.web_assets.format if self.web_assets else ""
+    
+    @property
+    def three_js_compatible(self):
+        return self.web_assets.three_js_compatible if self.web_assets else False
 
 @dataclass
 class BatchSummary:
@@ -96,10 +175,10 @@ class BatchSummary:
 class StandaloneTreeModel:
     """Standalone TreeModel replacement for OCAF document handling."""
     
-    def __init__(self, doc_name="STEP"):
+    def __init__(self, doc_name="STEP", app=None):
         try:
-            # Create OCAF application
-            self.app = XCAFApp_Application.GetApplication()
+            # Reuse a caller-supplied OCAF application, otherwise fetch the global one
+            self.app = app if app is not None else XCAFApp_Application.GetApplication()
             
             # Create document with proper TCollection_ExtendedString argument
             doc_name_ext = TCollection_ExtendedString(doc_name)
@@ -116,15 +195,26 @@ class StandaloneTreeModel:
         except Exception as e:
             logger.error(f"Failed to initialize OCAF document: {e}")
             raise
+    
+    def close(self):
+        """Close the document, releasing its C++ data while keeping the application alive."""
+        try:
+            self.app.Close(self.doc)
+        except Exception as e:
+            logger.debug(f"Failed to close OCAF document: {e}")
 
 class StepToJsonConverter:
     """Convert STEP files to JSON format containing assembly structure data."""
 
-    def __init__(self, filename, nextUID=0):
+    def __init__(self, filename, nextUID=0, app=None):
         self.filename = filename
+        self.app = app
+        # Part/assembly totals, counted as nodes are emitted
+        self._n_parts = 0
+        self._n_assemblies = 0
+        # Referred label tag -> (name, kind, color, shape_type, components), see findComponents
+        self._ref_cache = {}
         self._currentUID = nextUID
-        self.assyUidStack = [0]
-        self.assyLocStack = []
         
     def getNewUID(self):
         """Generate sequential unique identifiers."""
@@ -143,34 +233,22 @@ class StepToJsonConverter:
     def getColor(self, shape):
         """Extract color information and convert to JSON-compatible format."""
         try:
-            color = Quantity_Color()
-            has_color = self.color_tool.GetColor(shape, XCAFDoc_ColorSurf, color)
-            
-            if has_color:
-                return {
-                    'r': int(color.Red() * 255),
-                    'g': int(color.Green() * 255),
-                    'b': int(color.Blue() * 255),
-                    'hex': '#{:02x}{:02x}{:02x}'.format(
-                        int(color.Red() * 255),
-                        int(color.Green() * 255),
-                        int(color.Blue() * 255)
-                    )
-                }
+            color = _REUSABLE_COLOR
+            if self.color_tool.GetColor(shape, XCAFDoc_ColorSurf, color):
+                r = int(color.Red() * 255)
+                g = int(color.Green() * 255)
+                b = int(color.Blue() * 255)
+                return {'r': r, 'g': g, 'b': b, 'hex': f'#{r:02x}{g:02x}{b:02x}'}
         except Exception as e:
             logger.debug(f"Failed to get color: {e}")
         
         # Default gray color if no color found or error occurred
-        return {
-            'r': 128,
-            'g': 128,
-            'b': 128,
-            'hex': '#808080'
-        }
+        return _DEFAULT_COLOR
 
     def serializeLocation(self, location):
         """Convert TopLoc_Location to JSON-serializable format."""
         try:
+            # Hot callers skip identity locations themselves; kept as a safety net
             if location.IsIdentity():
                 return None
             
@@ -178,14 +256,19 @@ class StepToJsonConverter:
             trsf = location.Transformation()
             
             # Extract translation
+            t = trsf.TranslationPart()
             translation = {
-                'x': float(trsf.TranslationPart().X()),
-                'y': float(trsf.TranslationPart().Y()),
-                'z': float(trsf.TranslationPart().Z())
+                'x': float(t.X()),
+                'y': float(t.Y()),
+                'z': float(t.Z())
             }
             
-            # Check for rotation (simplified check)
-            has_rotation = not trsf.VectorialPart().IsEqual(trsf.VectorialPart(), 1e-7)
+            # Rotation present when the scale-free 3x3 part differs from identity
+            vp = trsf.HVectorialPart()
+            has_rotation = any(
+                abs(vp.Value(r, c) - (1.0 if r == c else 0.0)) > 1e-7
+                for r in (1, 2, 3) for c in (1, 2, 3)
+            )
             
             return {
                 'translation': translation,
@@ -196,112 +279,158 @@ class StepToJsonConverter:
             logger.debug(f"Failed to serialize location: {e}")
             return None
 
-    def findComponents(self, label, comps):
-        """Recursively find and process assembly components."""
+    def findComponents(self, label, comps, parent_uid):
+        """Walk assembly components depth-first using an explicit work stack.
+        
+        Returns a flat pre-order list of component dicts.
+        """
         components = []
+        append = components.append
+        shape_tool = self.shape_tool
+        getShape = shape_tool.GetShape
+        getRef = shape_tool.GetReferredShape
+        isAssy = shape_tool.IsAssembly
+        isSimple = shape_tool.IsSimpleShape
+        getLoc = shape_tool.GetLocation
+        getComps = shape_tool.GetComponents
+        getName = self.getName
+        getColor = self.getColor
+        serLoc = self.serializeLocation
+        newUID = self.getNewUID
+        typeName = self.getShapeTypeName
+        refCache = self._ref_cache
+        # Entry dumps cross into OCC and allocate a str; only pay for them when debugging
+        _DBG = logger.isEnabledFor(logging.DEBUG)
+        n_parts = 0
+        n_assemblies = 0
         
-        logger.debug(f"Processing {comps.Length()} components in label {label.EntryDumpToString()}")
+        # Frames are (label, comps, parent_uid, resume_index). Before descending into a
+        # sub-assembly the current frame is re-pushed at j+1, so output stays pre-order.
+        work = [(label, comps, parent_uid, 0)]
         
-        for j in range(comps.Length()):
-            try:
-                cLabel = comps.Value(j+1)
-                cShape = self.shape_tool.GetShape(cLabel)
-                name = self.getName(cLabel)
-                
-                # Get component entry for debugging
-                component_entry = cLabel.EntryDumpToString()
-                logger.debug(f"Component {j+1}: {name} (Entry: {component_entry})")
-                
-                # Get referenced shape/assembly
-                refLabel = TDF_Label()
-                isRef = self.shape_tool.GetReferredShape(cLabel, refLabel)
-                
-                if isRef:
-                    refShape = self.shape_tool.GetShape(refLabel)
-                    refName = self.getName(refLabel)
-                    ref_entry = refLabel.EntryDumpToString()
+        while work:
+            label, comps, parent_uid, start = work.pop()
+            n = comps.Length()
+            if _DBG and start == 0:
+                logger.debug(f"Processing {n} components in label {label.EntryDumpToString()}")
+            
+            for j in range(start, n):
+                try:
+                    cLabel = comps.Value(j+1)
+                    cShape = getShape(cLabel)
+                    name = getName(cLabel)
+                    
+                    # Get component entry for debugging
+                    component_entry = cLabel.EntryDumpToString() if _DBG else ''
+                    if _DBG:
+                        logger.debug(f"Component {j+1}: {name} (Entry: {component_entry})")
                     
-                    logger.debug(f"Reference: {refName} (Entry: {ref_entry})")
+                    # Get referenced shape/assembly
+                    refLabel = TDF_Label()
+                    isRef = getRef(cLabel, refLabel)
                     
-                    if self.shape_tool.IsSimpleShape(refLabel):
-                        # Process individual part/shape
-                        logger.debug(f"Processing simple shape: {refName}")
-                        color = self.getColor(refShape)
-                        location = self.shape_tool.GetLocation(cLabel)
+                    if isRef:
+                        # Referred shapes are direct children of the shapes label, so the
+                        # tag identifies the part/sub-assembly definition. Every instance
+                        # of it shares name, kind, color, shape type and component list.
+                        refKey = refLabel.Tag()
+                        ref = refCache.get(refKey)
+                        if ref is None:
+                            refName = getName(refLabel)
+                            if isSimple(refLabel):
+                                refShape = getShape(refLabel)
+                                ref = (refName, 'part', getColor(refShape), typeName(refShape), None)
+                            elif isAssy(refLabel):
+                                rComps = TDF_LabelSequence()
+                                subchilds = False
+                                getComps(refLabel, rComps, subchilds)
+                                ref = (refName, 'assembly', None, 'Assembly', rComps)
+                            else:
+                                ref = (refName, None, None, None, None)
+                            refCache[refKey] = ref
+                        refName, kind, color, shape_type, rComps = ref
+                        ref_entry = refLabel.EntryDumpToString() if _DBG else ''
                         
-                        component = {
+                        if _DBG:
+                            logger.debug(f"Reference: {refName} (Entry: {ref_entry})")
+                        
+                        if kind == 'part':
+                            # Process individual part/shape
+                            if _DBG:
+                                logger.debug(f"Processing simple shape: {refName}")
+                            location = getLoc(cLabel)
+                            serialized_loc = None if location.IsIdentity() else serLoc(location)
+                            
+                            append({
+                                'name': name or f"Component_{j+1}",
+                                'id': newUID(),
+                                'parent_id': parent_uid,
+                                'type': 'part',
+                                'is_assembly': False,
+                                'location': serialized_loc,
+                                'color': color,
+                                'shape_type': shape_type,
+                                'reference_name': refName or "Unnamed_Reference",
+                                'component_entry': component_entry,
+                                'reference_entry': ref_entry
+                            })
+                            n_parts += 1
+                            
+                        elif kind == 'assembly':
+                            # Process sub-assembly
+                            if _DBG:
+                                logger.debug(f"Processing sub-assembly: {refName}")
+                            location = getLoc(cLabel)
+                            serialized_loc = None if location.IsIdentity() else serLoc(location)
+                            newAssyUID = newUID()
+                            
+                            append({
+                                'name': name or f"Assembly_{j+1}",
+                                'id': newAssyUID,
+                                'parent_id': parent_uid,
+                                'type': 'assembly',
+                                'is_assembly': True,
+                                'location': serialized_loc,
+                                'color': None,
+                                'shape_type': 'Assembly',
+                                'reference_name': refName or "Unnamed_Assembly",
+                                'component_entry': component_entry,
+                                'reference_entry': ref_entry
+                            })
+                            n_assemblies += 1
+                            
+                            # Descend into sub-assembly components, resuming this level afterwards
+                            if rComps.Length():
+                                work.append((label, comps, parent_uid, j + 1))
+                                work.append((refLabel, rComps, newAssyUID, 0))
+                                break
+                    else:
+                        # Component without reference - create fallback entry
+                        if _DBG:
+                            logger.debug(f"Component without reference: {name}")
+                        color = getColor(cShape) if cShape else getColor(None)
+                        
+                        append({
                             'name': name or f"Component_{j+1}",
-                            'id': self.getNewUID(),
-                            'parent_id': self.assyUidStack[-1],
+                            'id': newUID(),
+                            'parent_id': parent_uid,
                             'type': 'part',
                             'is_assembly': False,
-                            'location': self.serializeLocation(location),
+                            'location': None,
                             'color': color,
-                            'shape_type': self.getShapeTypeName(refShape),
-                            'reference_name': refName or "Unnamed_Reference",
-                            'component_entry': component_entry,
-                            'reference_entry': ref_entry
-                        }
-                        components.append(component)
-                        
-                    elif self.shape_tool.IsAssembly(refLabel):
-                        # Process sub-assembly
-                        logger.debug(f"Processing sub-assembly: {refName}")
-                        location = self.shape_tool.GetLocation(cLabel)
-                        self.assyLocStack.append(location)
-                        newAssyUID = self.getNewUID()
-                        
-                        assembly = {
-                            'name': name or f"Assembly_{j+1}",
-                            'id': newAssyUID,
-                            'parent_id': self.assyUidStack[-1],
-                            'type': 'assembly',
-                            'is_assembly': True,
-                            'location': self.serializeLocation(location),
-                            'color': None,
-                            'shape_type': 'Assembly',
-                            'reference_name': refName or "Unnamed_Assembly",
+                            'shape_type': typeName(cShape) if cShape else 'Unknown',
+                            'reference_name': None,
                             'component_entry': component_entry,
-                            'reference_entry': ref_entry
-                        }
-                        components.append(assembly)
-                        
-                        # Recursively process sub-assembly components
-                        self.assyUidStack.append(newAssyUID)
-                        rComps = TDF_LabelSequence()
-                        subchilds = False
-                        isAssy = self.shape_tool.GetComponents(refLabel, rComps, subchilds)
+                            'reference_entry': None
+                        })
+                        n_parts += 1
                         
-                        if rComps.Length():
-                            sub_components = self.findComponents(refLabel, rComps)
-                            components.extend(sub_components)
-                        
-                        self.assyUidStack.pop()
-                        self.assyLocStack.pop()
-                else:
-                    # Component without reference - create fallback entry
-                    logger.debug(f"Component without reference: {name}")
-                    color = self.getColor(cShape) if cShape else self.getColor(None)
-                    
-                    component = {
-                        'name': name or f"Component_{j+1}",
-                        'id': self.getNewUID(),
-                        'parent_id': self.assyUidStack[-1],
-                        'type': 'part',
-                        'is_assembly': False,
-                        'location': None,
-                        'color': color,
-                        'shape_type': self.getShapeTypeName(cShape) if cShape else 'Unknown',
-                        'reference_name': None,
-                        'component_entry': component_entry,
-                        'reference_entry': None
-                    }
-                    components.append(component)
-                    
-            except Exception as e:
-                logger.error(f"Error processing component {j+1}: {e}")
-                continue
+                except Exception as e:
+                    logger.error(f"Error processing component {j+1}: {e}")
+                    continue
         
+        self._n_parts += n_parts
+        self._n_assemblies += n_assemblies
         return components
 
     def getShapeTypeName(self, shape):
@@ -328,10 +457,12 @@ class StepToJsonConverter:
     def convert_to_json(self):
         """Main conversion method - reads STEP file and returns JSON data."""
         logger.info(f"Converting STEP file: {self.filename}")
+        _DBG = logger.isEnabledFor(logging.DEBUG)
+        tmodel = None
         
         try:
-            # Initialize standalone tree model
-            tmodel = StandaloneTreeModel("STEP")
+            # Initialize standalone tree model on the (possibly shared) OCAF application
+            tmodel = StandaloneTreeModel("STEP", self.app)
             self.shape_tool = tmodel.shape_tool
             self.color_tool = tmodel.color_tool
 
@@ -384,7 +515,6 @@ class StepToJsonConverter:
                 # Process as assembly structure
                 logger.info(f"Processing assembly: {name}")
                 topLoc = self.shape_tool.GetLocation(rootlabel)
-                self.assyLocStack.append(topLoc)
                 
                 newAssyUID = self.getNewUID()
                 root_assembly = {
@@ -397,18 +527,18 @@ class StepToJsonConverter:
                     'color': None,
                     'shape_type': 'Assembly',
                     'is_root': True,
-                    'root_entry': rootlabel.EntryDumpToString()
+                    'root_entry': rootlabel.EntryDumpToString() if _DBG else ''
                 }
                 assembly_tree.append(root_assembly)
+                self._n_assemblies += 1
                 
-                self.assyUidStack.append(newAssyUID)
                 topComps = TDF_LabelSequence()
                 subchilds = False
                 isAssy = self.shape_tool.GetComponents(rootlabel, topComps, subchilds)
                 
                 logger.info(f"Root assembly has {topComps.Length()} components")
                 if topComps.Length():
-                    components = self.findComponents(rootlabel, topComps)
+                    components = self.findComponents(rootlabel, topComps, newAssyUID)
                     assembly_tree.extend(components)
             else:
                 # Process individual parts at root level
@@ -426,33 +556,45 @@ class StepToJsonConverter:
                     'is_root': True
                 }
                 assembly_tree.append(root_container)
-                self.assyUidStack = [newAssyUID]
+                self._n_assemblies += 1
+                
+                getShape = self.shape_tool.GetShape
+                getName = self.getName
+                getColor = self.getColor
+                newUID = self.getNewUID
+                typeName = self.getShapeTypeName
+                
+                # Root part count is known up front - fill a pre-sized list by index
+                n = labels.Length()
+                parts = [None] * n
                 
-                for j in range(labels.Length()):
+                for j in range(n):
                     label = labels.Value(j+1)
-                    name = self.getName(label)
+                    name = getName(label)
                     if not name:
                         name = f"Part_{j+1}"
-                    shape = self.shape_tool.GetShape(label)
-                    color = self.getColor(shape)
-                    shape_type = self.getShapeTypeName(shape)
+                    shape = getShape(label)
+                    color = getColor(shape)
+                    shape_type = typeName(shape)
                     
-                    part = {
+                    parts[j] = {
                         'name': name,
-                        'id': self.getNewUID(),
-                        'parent_id': self.assyUidStack[-1],
+                        'id': newUID(),
+                        'parent_id': newAssyUID,
                         'type': 'part',
                         'is_assembly': False,
                         'location': None,
                         'color': color,
                         'shape_type': shape_type,
-                        'label_entry': label.EntryDumpToString()
+                        'label_entry': label.EntryDumpToString() if _DBG else ''
                     }
-                    assembly_tree.append(part)
+                
+                assembly_tree.extend(parts)
+                self._n_parts += n
 
-            # Calculate statistics
-            total_parts = sum(1 for item in assembly_tree if not item['is_assembly'])
-            total_assemblies = sum(1 for item in assembly_tree if item['is_assembly'])
+            # Statistics were counted during traversal
+            total_parts = self._n_parts
+            total_assemblies = self._n_assemblies
 
             result = {
                 'filename': os.path.basename(self.filename),
@@ -469,6 +611,9 @@ class StepToJsonConverter:
         except Exception as e:
             logger.error(f"Conversion failed: {e}")
             raise
+        finally:
+            if tmodel is not None:
+                tmodel.close()
 
     def get_timestamp(self):
         """Get current timestamp for JSON output."""
@@ -478,28 +623,45 @@ class BOMAnalyzer:
     """Analyze BOM data and provide hierarchy tools."""
     
     def __init__(self, bom_file_path):
-        with open(bom_file_path, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
-        self.assembly_tree = self.data['assembly_tree']
-        self.items_by_id = {item['id']: item for item in self.assembly_tree}
+        # The file is parsed and indexed lazily, on first use of the properties below
+        self._path = bom_file_path
+    
+    @cached_property
+    def data(self):
+        return load_bom_json(self._path)
+    
+    @cached_property
+    def assembly_tree(self):
+        return self.data['assembly_tree']
+    
+    @cached_property
+    def items_by_id(self):
+        return {item['id']: item for item in self.assembly_tree}
+    
+    @cached_property
+    def children_by_parent(self):
+        """Single-pass parent -> children index, in assembly_tree order."""
+        children_by_parent = {}
+        for item in self.assembly_tree:
+            children_by_parent.setdefault(item['parent_id'], []).append(item)
+        return children_by_parent
     
     def find_children(self, parent_id):
         """Find all direct children of a given parent."""
-        children = []
-        for item in self.assembly_tree:
-            if item['parent_id'] == parent_id:
-                children.append(item)
-        return children
+        # A copy, so callers editing the result don't corrupt the index
+        return list(self.children_by_parent.get(parent_id, ()))
     
     def find_all_descendants(self, parent_id):
         """Find all descendants (children, grandchildren, etc.) of a given parent."""
         descendants = []
-        children = self.find_children(parent_id)
+        children_by_parent = self.children_by_parent
+        # Children are pushed reversed so descendants come out in depth-first pre-order
+        stack = list(reversed(children_by_parent.get(parent_id, ())))
         
-        for child in children:
-            descendants.append(child)
-            # Recursively find descendants of this child
-            descendants.extend(self.find_all_descendants(child['id']))
+        while stack:
+            item = stack.pop()
+            descendants.append(item)
+            stack.extend(reversed(children_by_parent.get(item['id'], ())))
         
         return descendants
     
@@ -519,28 +681,32 @@ class BOMAnalyzer:
     
     def build_hierarchy_tree(self):
         """Build a nested tree structure from flat array."""
-        # Add children list to each item
+        # Copy each child list so callers editing 'children' don't touch the index
         for item in self.assembly_tree:
-            item['children'] = []
+            item['children'] = list(self.children_by_parent.get(item['id'], ()))
         
-        # Build parent-child relationships
-        root_items = []
-        for item in self.assembly_tree:
-            if item['parent_id'] is None:
-                root_items.append(item)
-            else:
-                parent = self.items_by_id.get(item['parent_id'])
-                if parent:
-                    parent['children'].append(item)
-        
-        return root_items
+        return list(self.children_by_parent.get(None, ()))
 
 class BOMExtractor:
     """Main BOM extractor class that can be called from other modules."""
     
-    def __init__(self):
-        """Initialize the BOM extractor."""
-        pass
+    def __init__(self, cache_dir="output/.bom_cache", app=None):
+        """Initialize the BOM extractor.
+        
+        Args:
+            cache_dir (str): Directory for cached BOM JSON, used when STEP_BOM_CACHE=1
+            app: Optional XCAFApp_Application shared across files
+        """
+        self.cache_dir = cache_dir
+        self.app = app
+        self.cache_enabled = os.environ.get("STEP_BOM_CACHE") == "1"
+    
+    def _cache_path(self, input_step_file):
+        """Cache file path keyed by the STEP file's absolute path, mtime and size."""
+        abspath = os.path.abspath(input_step_file)
+        st = os.stat(abspath)
+        key = hashlib.sha1(f"{abspath}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, key + ".json")
     
     def extract_bom_data(self, input_step_file, output_dir, output_filename="bom_data.json"):
         """
@@ -572,14 +738,39 @@ class BOMExtractor:
                 os.makedirs(output_dir)
                 logger.info(f"Created output directory: {output_dir}")
             
+            cache_path = None
+            if self.cache_enabled:
+                cache_path = self._cache_path(input_step_file)
+                if os.path.exists(cache_path):
+                    # Unchanged STEP file - reuse the cached BOM without opening OCAF
+                    output_file = os.path.join(output_dir, output_filename)
+                    shutil.copyfile(cache_path, output_file)
+                    assembly_data = load_bom_json(cache_path)
+                    logger.info(f"Using cached BOM for: {input_step_file}")
+                    return {
+                        "total_parts": assembly_data['total_parts'],
+                        "total_assemblies": assembly_data['total_assemblies'],
+                        "output_file": output_file,
+                        "filename": assembly_data['filename'],
+                        "timestamp": assembly_data['timestamp'],
+                        "assembly_tree": assembly_data['assembly_tree']
+                    }
+            
             # Convert STEP to JSON
             logger.info(f"Converting STEP file: {input_step_file}")
-            converter = StepToJsonConverter(input_step_file)
+            converter = StepToJsonConverter(input_step_file, app=self.app)
             assembly_data = converter.convert_to_json()
             
             # Save BOM data with custom filename
             output_file = save_bom_json(assembly_data, output_dir, output_filename)
             
+            if cache_path:
+                # Publish to the cache atomically so readers never see a partial file
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                shutil.copyfile(output_file, tmp_path)
+                os.replace(tmp_path, cache_path)
+            
             # Return success result
             result = {
                 "total_parts": assembly_data['total_parts'],
@@ -594,6 +785,9 @@ class BOMExtractor:
             return result
             
         except Exception as e:
+            if _is_disk_full(e):
+                # Raised through the worker future so the batch can stop
+                raise
             error_msg = f"BOM extraction failed: {str(e)}"
             logger.error(error_msg)
             return {
@@ -602,9 +796,35 @@ class BOMExtractor:
                 "total_assemblies": 0
             }
 
+def _is_disk_full(exc):
+    """True for the ENOSPC error every later write would hit as well."""
+    return isinstance(exc, OSError) and exc.errno == errno.ENOSPC
+
+# OCAF application handle owned by a BOM pool worker, set up by _warm_occ
+_worker_app = None
+
+def _rss_mb():
+    """Peak resident set size of this process in MB (0.0 where unavailable)."""
+    if resource is None:
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+def _warm_occ():
+    """Process pool initializer - build one throwaway OCAF document so workers start warm."""
+    global _worker_app
+    _worker_app = XCAFApp_Application.GetApplication()
+    StandaloneTreeModel("WARMUP", _worker_app).close()
+
+def _extract_worker(input_step_file, output_dir, output_filename):
+    """Run BOM extraction inside a pool worker and return its JSON-serializable result."""
+    extractor = BOMExtractor(app=_worker_app)
+    return extractor.extract_bom_data(input_step_file, output_dir, output_filename)
+
 # GLB Conversion Class (unchanged from original)
 class WebConverter:
-    """GLB converter with timeout protection."""
+    """GLB converter; timeout protection is applied by the caller's executor."""
     
     def __init__(self):
         self.cascadio_available = self._check_cascadio()
@@ -616,24 +836,31 @@ class WebConverter:
         except ImportError:
             return False
     
-    def _convert_worker(self, input_path, output_path, result_queue):
+    def _convert_worker(self, input_path, output_path):
+        # cascadio writes to a temp file beside the target, so publishing it is a same-filesystem rename
+        tmp_path = os.path.join(os.path.dirname(output_path), f".tmp.{uuid.uuid4().hex}.glb")
         try:
             import cascadio
             logger.info(f"🔄 Starting GLB conversion...")
-            cascadio.step_to_glb(input_path, output_path)
+            cascadio.step_to_glb(input_path, tmp_path)
             
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                result_queue.put({'success': True, 'file_size': file_size})
+            if os.path.exists(tmp_path):
+                os.replace(tmp_path, output_path)
+                file_size = os.stat(output_path).st_size
                 logger.info(f"✅ GLB conversion completed - {file_size/(1024*1024):.2f} MB")
-            else:
-                result_queue.put({'success': False, 'error': 'GLB file was not created'})
+                return {'success': True, 'file_size': file_size}
+            return {'success': False, 'error': 'GLB file was not created'}
             
         except Exception as e:
             logger.error(f"❌ GLB conversion error: {e}")
-            result_queue.put({'success': False, 'error': str(e)})
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if _is_disk_full(e):
+                raise
+            return {'success': False, 'error': str(e)}
     
-    def convert_to_web_format(self, input_path: str, output_dir: str, output_filename: str = "model.glb", timeout_seconds: int = 300) -> WebAssetsData:
+    def convert_to_web_format(self, input_path: str, output_dir: str, output_filename: str = "model.glb") -> WebAssetsData:
+        """Convert in the calling thread; callers enforce timeouts on the surrounding future."""
         web_assets = WebAssetsData()
         
         if not self.cascadio_available:
@@ -645,30 +872,20 @@ class WebConverter:
                 os.makedirs(output_dir)
             
             glb_path = os.path.join(output_dir, output_filename)
+            result = self._convert_worker(input_path, glb_path)
             
-            result_queue = queue.Queue()
-            conversion_thread = threading.Thread(
-                target=self._convert_worker, 
-                args=(input_path, glb_path, result_queue)
-            )
-            conversion_thread.daemon = True
-            conversion_thread.start()
-            
-            try:
-                result = result_queue.get(timeout=timeout_seconds)
-                
-                if result['success']:
-                    web_assets.glb_file = output_filename
-                    web_assets.file_size = result['file_size']
-                    web_assets.format = "GLB"
-                    web_assets.three_js_compatible = True
-                else:
-                    web_assets.conversion_error = result['error']
-                    
-            except queue.Empty:
-                web_assets.conversion_error = f"GLB conversion timed out after {timeout_seconds} seconds"
+            if result['success']:
+                web_assets.glb_file = output_filename
+                web_assets.file_size = result['file_size']
+                web_assets.format = "GLB"
+                web_assets.three_js_compatible = True
+            else:
+                web_assets.conversion_error = result['error']
                 
         except Exception as e:
+            if _is_disk_full(e):
+                # Raised through the worker future so the batch can stop
+                raise
             web_assets.conversion_error = str(e)
         
         return web_assets
@@ -687,145 +904,489 @@ def save_bom_json(assembly_data, output_dir, filename='bom_data.json'):
         'version': '2.2'
     }
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(bom_data, f, indent=2, ensure_ascii=False)
+    # Write beside the target and rename, so a crash never leaves a truncated BOM behind
+    tmp_file = os.path.join(output_dir, f".tmp.{uuid.uuid4().hex}.json")
+    try:
+        if orjson is not None:
+            # orjson encodes straight to UTF-8 bytes without building an intermediate str
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(bom_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(bom_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, output_file)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
     
     return output_file
 
+def load_bom_json(bom_file_path):
+    """Load a BOM JSON file, using orjson when available."""
+    if orjson is not None:
+        with open(bom_file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(bom_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 def get_ordered_step_files(model_folder="model"):
     """Get all STEP files sorted by name for consistent processing order."""
-    if not os.path.exists(model_folder):
-        return []
+    return [path for path, _, _ in scan_step_files(model_folder)]
+
+_SANITIZE_BAD = re.compile(r'[<>:"/\\|?*]')
+_SANITIZE_UND = re.compile(r'_+')
+
+def sanitize_filename(filename):
+    """Sanitize filename for directory names."""
+    return _SANITIZE_UND.sub('_', _SANITIZE_BAD.sub('_', filename)).strip('._')
+
+@lru_cache(maxsize=256)
+def _glb_timeout_for_mb(size_mb):
+    """Timeout tier for a whole-MB file size."""
+    if size_mb <= 50:
+        return 240
+    elif size_mb <= 100:
+        return 360
+    elif size_mb <= 200:
+        return 480
+    else:
+        return 600
+
+def _sha256_file(path):
+    """SHA-256 hex digest of a file.
     
-    step_extensions = ['*.step', '*.stp', '*.STEP', '*.STP']
-    step_files = []
+    Python 3.11+ hashes with file_digest, which reads and hashes in C (OpenSSL, SHA-NI
+    where the CPU has it). Older interpreters fall back to HASH_CHUNK_SIZE reads.
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(partial(f.read, HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+def _glb_worker(input_path, output_dir, output_filename):
+    """Run GLB conversion inside a pool worker and return its WebAssetsData."""
+    return WebConverter().convert_to_web_format(input_path, output_dir, output_filename)
+
+class RecyclingProcessPool:
+    """Single-worker ProcessPoolExecutor that is replaced by a fresh one every `recycle_every` tasks.
+    
+    Worker memory, including OCC's C++ heap, goes back to the OS regularly. This is not
+    max_tasks_per_child because that switches the pool to the spawn start method, which
+    re-imports OCC in every worker. With one worker per pool, terminate() can kill a
+    stuck task without touching other files' work. A broken pool (crashed worker) is
+    replaced on the next submit. Safe to share between threads.
+    """
+    
+    def __init__(self, recycle_every, initializer=None):
+        self.recycle_every = recycle_every
+        self.initializer = initializer
+        self._pool = None
+        self._tasks = 0
+        self._lock = threading.Lock()
     
-    for extension in step_extensions:
-        step_files.extend(glob.glob(os.path.join(model_folder, extension)))
+    def _new_pool(self):
+        self._pool = ProcessPoolExecutor(max_workers=1, initializer=self.initializer)
+        self._tasks = 0
+    
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._pool is not None and self._tasks >= self.recycle_every:
+                # Already-submitted tasks still finish; workers exit once they are done
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                self._new_pool()
+            self._tasks += 1
+            try:
+                return self._pool.submit(fn, *args)
+            except BrokenProcessPool:
+                self._pool.shutdown(wait=False)
+                self._new_pool()
+                self._tasks += 1
+                return self._pool.submit(fn, *args)
     
-    step_files = sorted(list(set(step_files)), key=lambda x: os.path.basename(x).lower())
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+                self._pool = None
     
-    return step_files
+    def terminate(self):
+        """Kill the worker and its task; the next submit starts a fresh pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            terminate_executor(pool)
 
-def sanitize_filename(filename):
-    """Sanitize filename for directory names."""
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    sanitized = re.sub(r'_+', '_', sanitized).strip('._')
-    return sanitized
+class GLBPublisher:
+    """Background thread that moves finished GLB files from scratch into the output tree.
+    
+    Lets the per-file thread return while the (possibly remote) output write is still in
+    flight. Each file lands under a temp name next to its destination and is renamed, so
+    readers never see a partial GLB. Call drain() before relying on the outputs.
+    """
+    
+    def __init__(self, on_error=None):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Called with the exception of each failed move, from the publisher thread
+        self._on_error = on_error
+        self.failed = []
+    
+    def publish(self, src_path, dst_path):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="glb-publisher", daemon=True)
+                self._thread.start()
+        self._queue.put((src_path, dst_path))
+    
+    def _run(self):
+        while True:
+            src_path, dst_path = self._queue.get()
+            try:
+                dst_dir = os.path.dirname(dst_path)
+                if not os.path.exists(dst_dir):
+                    os.makedirs(dst_dir, exist_ok=True)
+                tmp_path = os.path.join(dst_dir, f".tmp.{uuid.uuid4().hex}.glb")
+                try:
+                    shutil.move(src_path, tmp_path)
+                    os.replace(tmp_path, dst_path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            except Exception as e:
+                logger.error(f"Failed to publish {dst_path}: {e}")
+                self.failed.append((dst_path, str(e)))
+                if self._on_error is not None:
+                    self._on_error(e)
+            finally:
+                # Scratch space is often RAM; never leave a file's dir behind
+                shutil.rmtree(os.path.dirname(src_path), ignore_errors=True)
+                self._queue.task_done()
+    
+    def drain(self):
+        """Block until every queued GLB has been moved into place."""
+        self._queue.join()
 
 class SequentialStepProcessor:
     """Enhanced sequential processor with reference BOM extraction."""
     
-    def __init__(self):
-        self.web_converter = WebConverter()
+    def __init__(self, bom_workers=None, verbose=None):
+        # Full per-file reports on a terminal; one progress line per file otherwise.
+        # The full report is always kept on ProcessingResult.report.
+        self.verbose = sys.stdout.isatty() if verbose is None else verbose
+        # Also caps how many files are in flight, so no file waits for a free worker
+        self.bom_workers = bom_workers or max(1, (os.cpu_count() or 2) // 2)
+        # One single-worker BOM pool and GLB pool per in-flight file; a file checks out a
+        # pair, so a stage that times out can be killed without touching other files.
+        # GLB conversion runs in worker processes so cascadio/OCCT memory is freed on exit.
+        self._bom_pools = [RecyclingProcessPool(BOM_WORKER_RECYCLE_EVERY, _warm_occ)
+                           for _ in range(self.bom_workers)]
+        self._glb_pools = [RecyclingProcessPool(GLB_WORKER_RECYCLE_EVERY)
+                           for _ in range(self.bom_workers)]
+        self._free_pools = queue.SimpleQueue()
+        for pools in zip(self._bom_pools, self._glb_pools):
+            self._free_pools.put(pools)
+        self._since_gc = 0
+        self._gc_rss_mark = _rss_mb()
+        # Unique names: one timestamp per batch plus a monotonically increasing counter
+        self._batch_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._seq = itertools.count(1)
+        self._size_cache = {}
+        self.glb_publisher = GLBPublisher(on_error=self._stop_if_disk_full)
+        # Set on Ctrl-C or a systemic error; in-flight files stop waiting and cancel their stages
+        self._stop = threading.Event()
+        self._disk_full = False
+        # Content hash -> outputs of a previous run, persisted as output/.cache.json
+        self._output_cache = {}
+        self._output_cache_path = None
+        self._output_cache_lock = threading.Lock()
+    
+    def _maybe_collect(self):
+        """Run a full GC every GC_EVERY_N_FILES files or after GC_RSS_GROWTH_MB of RSS growth."""
+        self._since_gc += 1
+        rss = _rss_mb()
+        if self._since_gc >= GC_EVERY_N_FILES or rss - self._gc_rss_mark > GC_RSS_GROWTH_MB:
+            gc.collect()
+            self._since_gc = 0
+            self._gc_rss_mark = rss
+    
+    def _stop_if_disk_full(self, exc):
+        """Stop the batch on ENOSPC; every remaining file would fail the same way."""
+        if _is_disk_full(exc):
+            self._disk_full = True
+            self._stop.set()
+    
+    def close(self):
+        """Shut down the BOM and GLB worker pools and flush pending GLB moves.
+        
+        After a stop (Ctrl-C, disk full) the workers are terminated: OCC calls can't be
+        interrupted, and the interpreter would otherwise wait for them at exit.
+        """
+        stopped = self._stop.is_set()
+        for pool in self._bom_pools + self._glb_pools:
+            if stopped:
+                pool.terminate()
+            else:
+                pool.shutdown(wait=True)
+        self.glb_publisher.drain()
     
     def generate_unique_name(self, step_file_path):
         """Generate unique name for output files."""
         base_name = os.path.splitext(os.path.basename(step_file_path))[0]
         base_name = sanitize_filename(base_name)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
-        return f"{base_name}_{timestamp}"
+        return f"{base_name}_{self._batch_stamp}_{next(self._seq):06d}"
     
     def calculate_glb_timeout(self, file_size_mb):
         """Calculate GLB timeout based on file size."""
-        if file_size_mb <= 50:
-            return 240
-        elif file_size_mb <= 100:
-            return 360
-        elif file_size_mb <= 200:
-            return 480
+        # Whole-MB buckets (rounded up, so tier boundaries are unchanged) share cache entries
+        return _glb_timeout_for_mb(math.ceil(file_size_mb))
+    
+    def get_file_size_mb(self, file_path):
+        """File size in MB, stat'ed once per path, for callers that did not pass a scanned size."""
+        size_mb = self._size_cache.get(file_path)
+        if size_mb is None:
+            size_mb = os.path.getsize(file_path) / (1024 * 1024)
+            self._size_cache[file_path] = size_mb
+        return size_mb
+    
+    def load_output_cache(self, cache_path):
+        """Load the content-hash -> outputs map left by earlier runs, if any."""
+        self._output_cache_path = cache_path
+        self._output_cache = {}
+        if os.path.exists(cache_path):
+            try:
+                self._output_cache = load_bom_json(cache_path)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable output cache {cache_path}: {e}")
+    
+    def save_output_cache(self):
+        """Write the output cache back atomically."""
+        if not self._output_cache_path:
+            return
+        with self._output_cache_lock:
+            entries = dict(self._output_cache)
+        tmp_path = f"{self._output_cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self._output_cache_path) or ".", exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self._output_cache_path)
+        except Exception as e:
+            logger.warning(f"Could not save output cache {self._output_cache_path}: {e}")
+    
+    def _cached_outputs(self, content_hash):
+        """Outputs recorded for this content hash, if they are all still on disk and complete."""
+        with self._output_cache_lock:
+            entry = self._output_cache.get(content_hash)
+        if not entry:
+            return None
+        try:
+            # A size mismatch means the file was replaced or truncated since it was recorded
+            if (os.path.getsize(entry['bom_path']) == entry.get('bom_size')
+                    and os.path.getsize(entry['glb_path']) == entry.get('glb_size')):
+                return entry
+        except OSError:
+            pass
+        return None
+    
+    def _record_outputs(self, result, mtime):
+        with self._output_cache_lock:
+            self._output_cache[result.content_hash] = {
+                'bom_path': result.bom_output_file,
+                'glb_path': result.glb_file_path,
+                'bom_size': os.path.getsize(result.bom_output_file),
+                'glb_size': result.glb_file_size,
+                'mtime': mtime,
+                'unique_name': result.unique_name,
+            }
+    
+    def process_single_file(self, input_step_file, bom_base_dir, glb_base_dir, file_index, total_files,
+                            file_size=None, file_mtime=None):
+        """Process a single STEP file with reference BOM extraction and unique filenames.
+        
+        `file_size` (bytes) and `file_mtime` can be passed from an earlier directory scan
+        to skip re-stat'ing the file. The per-file report is buffered and, in verbose mode,
+        written with a single stdout write, so files processed concurrently don't interleave
+        and each line doesn't flush on its own.
+        """
+        buf = io.StringIO()
+        result = None
+        try:
+            result = self._process_single_file(
+                input_step_file, bom_base_dir, glb_base_dir, file_index, total_files,
+                file_size, file_mtime, partial(print, file=buf)
+            )
+            return result
+        finally:
+            report = buf.getvalue()
+            if result is not None:
+                result.report = report
+            if self.verbose or result is None:
+                sys.stdout.write(report)
+    
+    def _print_progress(self, done, total, result):
+        """One-line progress for non-verbose runs; redrawn in place on a terminal."""
+        width = 30
+        filled = width * done // total
+        bar = "█" * filled + "░" * (width - filled)
+        ok = (not result.bom_error) + (not result.glb_error)
+        status_emoji = "✅" if ok == 2 else "⚠️" if ok == 1 else "❌"
+        line = f"[{done}/{total}] {bar} {status_emoji} {result.filename} ({result.processing_duration:.1f}s)"
+        if sys.stdout.isatty():
+            sys.stdout.write(f"\r\033[K{line}" + ("\n" if done == total else ""))
+            sys.stdout.flush()
         else:
-            return 600
+            sys.stdout.write(line + "\n")
     
-    def process_single_file(self, input_step_file, bom_base_dir, glb_base_dir, file_index, total_files):
-        """Process a single STEP file with reference BOM extraction and unique filenames."""
-        start_time = datetime.now()
+    def _process_single_file(self, input_step_file, bom_base_dir, glb_base_dir, file_index, total_files,
+                             file_size, file_mtime, out):
+        # Durations use the monotonic clock; wall-clock time is only kept for the timestamp
+        t0 = time.perf_counter()
         
-        file_size_mb = os.path.getsize(input_step_file) / (1024 * 1024)
+        if file_size is None:
+            file_size_mb = self.get_file_size_mb(input_step_file)
+        else:
+            file_size_mb = file_size / (1024 * 1024)
         unique_name = self.generate_unique_name(input_step_file)
         bom_output_dir = os.path.join(bom_base_dir, unique_name)
         glb_output_dir = os.path.join(glb_base_dir, unique_name)
+        glb_write_dir = os.path.join(GLB_SCRATCH_DIR, unique_name) if GLB_SCRATCH_DIR else glb_output_dir
         
         result = ProcessingResult()
         result.filename = os.path.basename(input_step_file)
         result.unique_name = unique_name
-        result.timestamp = start_time.isoformat()
+        result.timestamp = datetime.now().isoformat()
         result.file_size_mb = file_size_mb
         
-        print(f"\n[{file_index}/{total_files}] 📂 {result.filename}")
-        print("=" * 60)
-        print(f"📏 Size: {file_size_mb:.2f} MB")
-        print(f"🏷️ Unique name: {unique_name}")
-        print(f"📋 BOM output: {bom_output_dir}")
-        print(f"🌐 GLB output: {glb_output_dir}")
+        out(f"\n[{file_index}/{total_files}] 📂 {result.filename}")
+        out(_SEP60)
+        out(f"📏 Size: {file_size_mb:.2f} MB")
         
-        # Step 1: Reference BOM Extraction with unique filename
-        print(f"\n📋 STEP 1: REFERENCE BOM EXTRACTION")
-        print("-" * 40)
+        # Unchanged input whose outputs are still on disk: reuse them instead of reprocessing
+        result.content_hash = _sha256_file(input_step_file)
+        cached = self._cached_outputs(result.content_hash)
+        if cached is not None:
+            try:
+                return self._reuse_outputs(result, cached, t0, out)
+            except Exception as e:
+                logger.warning(f"Cached outputs for {input_step_file} unusable, reprocessing: {e}")
         
+        out(f"🏷️ Unique name: {unique_name}")
+        out(f"📋 BOM output: {bom_output_dir}")
+        out(f"🌐 GLB output: {glb_output_dir}")
+        
+        # Set once the GLB is handed to the publisher, which then owns the scratch dir
+        published = False
         try:
-            if not os.path.exists(bom_output_dir):
-                os.makedirs(bom_output_dir)
+            # BOM extraction and GLB conversion read the same STEP file independently -
+            # submit both up front and wait for the pair, so per-file time is max(BOM, GLB)
+            glb_timeout = self.calculate_glb_timeout(file_size_mb)
+            bom_filename = f"{unique_name}_bom.json"
+            glb_filename = f"{unique_name}_model.glb"
             
-            print("🚀 Starting reference BOM extraction...")
-            extractor = BOMExtractor()
+            out(f"🚀 Starting BOM extraction and GLB conversion ({glb_timeout//60}min GLB timeout)...")
+            # Concurrency is capped at bom_workers, so a free pair is always available
+            bom_pool, glb_pool = self._free_pools.get()
+            try:
+                bom_future = bom_pool.submit(_extract_worker, input_step_file, bom_output_dir, bom_filename)
+                glb_future = glb_pool.submit(_glb_worker, input_step_file, glb_write_dir, glb_filename)
+                # Each stage has its own deadline; wait in short slices so a batch stop is
+                # noticed without waiting out the timeouts
+                start = time.perf_counter()
+                deadlines = {
+                    bom_future: start + BOM_TIMEOUT_SECONDS if BOM_TIMEOUT_SECONDS else math.inf,
+                    glb_future: start + glb_timeout,
+                }
+                pending = {bom_future, glb_future}
+                while pending and not self._stop.is_set():
+                    now = time.perf_counter()
+                    pending = {future for future in pending if deadlines[future] > now}
+                    if not pending:
+                        break
+                    remaining = min(deadlines[future] for future in pending) - now
+                    _, pending = wait(pending, timeout=min(remaining, STOP_POLL_SECONDS))
+                done = {future for future in (bom_future, glb_future) if future.done()}
+                stopped = self._stop.is_set()
+                # Timed out or stopped: a worker left running would keep its CPU and
+                # memory and block interpreter exit
+                if bom_future not in done:
+                    bom_future.cancel()
+                    bom_pool.terminate()
+                if glb_future not in done:
+                    glb_future.cancel()
+                    glb_pool.terminate()
+            finally:
+                self._free_pools.put((bom_pool, glb_pool))
             
-            # Create unique BOM filename that matches GLB naming convention
-            bom_filename = f"{unique_name}_bom.json"
-            bom_result = extractor.extract_bom_data(input_step_file, bom_output_dir, bom_filename)
+            # Step 1: Reference BOM Extraction with unique filename
+            out(_HDR_STEP1)
             
-            if "error" in bom_result:
-                print(f"❌ BOM extraction failed: {bom_result['error']}")
-                result.bom_error = bom_result['error']
+            if bom_future not in done:
+                result.bom_error = "BOM extraction cancelled" if stopped else f"BOM extraction timed out after {BOM_TIMEOUT_SECONDS} seconds"
+                out(f"❌ BOM extraction failed: {result.bom_error}")
+            elif bom_future.exception() is not None:
+                self._stop_if_disk_full(bom_future.exception())
+                result.bom_error = str(bom_future.exception()) or type(bom_future.exception()).__name__
+                out(f"❌ BOM extraction failed: {result.bom_error}")
             else:
-                result.total_parts = bom_result['total_parts']
-                result.total_assemblies = bom_result['total_assemblies']
-                result.bom_output_file = bom_result['output_file']
-                result.assembly_tree = bom_result['assembly_tree']
-                
-                print(f"✅ BOM: {result.total_parts} parts, {result.total_assemblies} assemblies")
-                print(f"📄 Output: {bom_filename}")
+                bom_result = bom_future.result()
                 
-        except Exception as e:
-            print(f"❌ BOM extraction failed: {str(e)}")
-            result.bom_error = str(e)
-        
-        # Step 2: GLB Conversion (unchanged)
-        print(f"\n🌐 STEP 2: GLB CONVERSION")
-        print("-" * 30)
-        
-        try:
-            glb_timeout = self.calculate_glb_timeout(file_size_mb)
-            print(f"🚀 Starting GLB conversion ({glb_timeout//60}min timeout)...")
+                if "error" in bom_result:
+                    out(f"❌ BOM extraction failed: {bom_result['error']}")
+                    result.bom_error = bom_result['error']
+                else:
+                    result.total_parts = bom_result['total_parts']
+                    result.total_assemblies = bom_result['total_assemblies']
+                    result.bom_output_file = bom_result['output_file']
+                    result.assembly_tree = bom_result['assembly_tree']
+                    
+                    out(f"✅ BOM: {result.total_parts} parts, {result.total_assemblies} assemblies")
+                    out(f"📄 Output: {bom_filename}")
             
-            glb_filename = f"{unique_name}_model.glb"
-            web_assets = self.web_converter.convert_to_web_format(
-                input_step_file, glb_output_dir, glb_filename, glb_timeout
-            )
+            # Step 2: GLB Conversion (ran alongside Step 1)
+            out(_HDR_STEP2)
             
-            if web_assets.conversion_error:
-                print(f"❌ GLB failed: {web_assets.conversion_error}")
-                result.glb_error = web_assets.conversion_error
-            elif web_assets.conversion_unavailable:
-                print(f"⚠️ GLB unavailable: {web_assets.conversion_unavailable}")
-                result.glb_error = web_assets.conversion_unavailable
+            if glb_future not in done:
+                result.glb_error = "GLB conversion cancelled" if stopped else f"GLB conversion timed out after {glb_timeout} seconds"
+                out(f"❌ GLB failed: {result.glb_error}")
+            elif glb_future.exception() is not None:
+                self._stop_if_disk_full(glb_future.exception())
+                result.glb_error = str(glb_future.exception()) or type(glb_future.exception()).__name__
+                out(f"❌ GLB conversion failed: {result.glb_error}")
             else:
-                result.glb_file = web_assets.glb_file
-                result.glb_file_path = os.path.join(glb_output_dir, web_assets.glb_file)
-                result.glb_file_size = web_assets.file_size
-                result.glb_format = web_assets.format
-                result.three_js_compatible = web_assets.three_js_compatible
-                
-                print(f"✅ GLB: {result.glb_file_size / (1024*1024):.2f} MB")
-                print(f"📄 Output: {glb_filename}")
+                web_assets = glb_future.result()
                 
-        except Exception as e:
-            print(f"❌ GLB conversion failed: {str(e)}")
-            result.glb_error = str(e)
+                if web_assets.conversion_error:
+                    out(f"❌ GLB failed: {web_assets.conversion_error}")
+                    result.glb_error = web_assets.conversion_error
+                elif web_assets.conversion_unavailable:
+                    out(f"⚠️ GLB unavailable: {web_assets.conversion_unavailable}")
+                    result.glb_error = web_assets.conversion_unavailable
+                else:
+                    result.web_assets = web_assets
+                    result.glb_file_path = os.path.join(glb_output_dir, web_assets.glb_file)
+                    if glb_write_dir != glb_output_dir:
+                        # Move to the output tree in the background; close() waits for it
+                        self.glb_publisher.publish(os.path.join(glb_write_dir, web_assets.glb_file),
+                                                   result.glb_file_path)
+                        published = True
+                    
+                    out(f"✅ GLB: {result.glb_file_size / (1024*1024):.2f} MB")
+                    out(f"📄 Output: {glb_filename}")
+        finally:
+            if glb_write_dir != glb_output_dir and not published:
+                # Timed out, failed or cancelled - don't leave the scratch dir behind
+                shutil.rmtree(glb_write_dir, ignore_errors=True)
         
         # Calculate duration
-        end_time = datetime.now()
-        result.processing_duration = (end_time - start_time).total_seconds()
+        result.processing_duration = time.perf_counter() - t0
         
         # Print file summary
         success_count = 0
@@ -835,26 +1396,55 @@ class SequentialStepProcessor:
             success_count += 1
         
         status_emoji = "✅" if success_count == 2 else "⚠️" if success_count == 1 else "❌"
-        print(f"\n{status_emoji} File completed in {result.processing_duration:.1f}s")
-        print(f"🔗 Unique files created:")
+        out(f"\n{status_emoji} File completed in {result.processing_duration:.1f}s")
+        out(f"🔗 Unique files created:")
         if not result.bom_error:
-            print(f"  • BOM JSON: {unique_name}_bom.json")
+            out(f"  • BOM JSON: {unique_name}_bom.json")
         if not result.glb_error:
-            print(f"  • GLB Model: {unique_name}_model.glb")
+            out(f"  • GLB Model: {unique_name}_model.glb")
+        
+        if not result.bom_error and not result.glb_error:
+            self._record_outputs(result, file_mtime if file_mtime is not None else os.path.getmtime(input_step_file))
         
         return result
     
+    def _reuse_outputs(self, result, cached, t0, out):
+        """Fill `result` from a previous run's outputs for the same file content."""
+        bom_data = load_bom_json(cached['bom_path'])
+        glb_file_size = cached['glb_size']
+        result.unique_name = cached['unique_name']
+        result.reused_outputs = True
+        result.total_parts = bom_data['total_parts']
+        result.total_assemblies = bom_data['total_assemblies']
+        result.assembly_tree = bom_data['assembly_tree']
+        result.bom_output_file = cached['bom_path']
+        result.web_assets = WebAssetsData(
+            glb_file=os.path.basename(cached['glb_path']),
+            file_size=glb_file_size,
+            format="GLB",
+            three_js_compatible=True
+        )
+        result.glb_file_path = cached['glb_path']
+        result.processing_duration = time.perf_counter() - t0
+        
+        out(f"♻️ Unchanged since last run - reusing outputs")
+        out(f"📄 BOM: {result.bom_output_file}")
+        out(f"📄 GLB: {result.glb_file_path}")
+        return result
+    
     def process_all_files_sequentially(self, model_folder="model", bom_base_dir="output/bom", glb_base_dir="output/web"):
-        """Process all STEP files in sequence with reference BOM extraction."""
-        batch_start_time = datetime.now()
+        """Process all STEP files in the model folder with reference BOM extraction."""
+        batch_t0 = time.perf_counter()
+        self._stop.clear()
+        self._disk_full = False
+        # Each batch gets its own name prefix. The counter is not reset, so names stay
+        # unique even if two batches start within the same second.
+        self._batch_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        print("🔄 ENHANCED SEQUENTIAL STEP FILE PROCESSOR")
-        print("📝 Now using reference BOM extraction logic!")
-        print("🏷️ All files saved with unique timestamps!")
-        print("📁 Processing files one by one in order")
-        print("=" * 60)
+        print(_HEADER_LINES)
         
-        step_files = get_ordered_step_files(model_folder)
+        # (path, size, mtime) from one scandir pass, handed on so no file is stat'ed again
+        step_files = scan_step_files(model_folder)
         
         if not step_files:
             print(f"❌ No STEP files found in '{model_folder}' folder")
@@ -862,22 +1452,39 @@ class SequentialStepProcessor:
         
         batch_summary = BatchSummary()
         batch_summary.total_files = len(step_files)
+        self.load_output_cache(os.path.join(os.path.dirname(bom_base_dir) or ".", ".cache.json"))
         
         print(f"📊 Found {len(step_files)} files to process:")
-        for i, file_path in enumerate(step_files, 1):
-            file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-            print(f"  {i:2d}. {os.path.basename(file_path)} ({file_size_mb:.1f} MB)")
+        for i, (file_path, file_size, _) in enumerate(step_files, 1):
+            print(f"  {i:2d}. {os.path.basename(file_path)} ({file_size / (1024 * 1024):.1f} MB)")
         
-        print(f"\n🚀 Starting sequential processing with reference BOM extraction...")
+        # Files are independent, so several run at once; each one's BOM and GLB stages
+        # already overlap. Concurrency is capped at bom_workers so stage timeouts never
+        # include time spent queueing for a BOM worker.
+        max_parallel = min(len(step_files), self.bom_workers)
+        print(f"\n🚀 Starting processing with reference BOM extraction ({max_parallel} files at a time)...")
         
+        # Largest files first (LPT) so a big file never starts last and stretches the tail;
+        # files keep their listing index for progress labels and result order
+        schedule = sorted(enumerate(step_files, 1), key=lambda item: item[1][1], reverse=True)
+        
+        file_executor = ThreadPoolExecutor(max_workers=max_parallel)
+        results_by_index = {}
         try:
-            for i, step_file in enumerate(step_files, 1):
+            futures = {
+                file_executor.submit(
+                    self.process_single_file,
+                    step_file, bom_base_dir, glb_base_dir, i, len(step_files), file_size, file_mtime
+                ): (i, step_file)
+                for i, (step_file, file_size, file_mtime) in schedule
+            }
+            
+            for future in as_completed(futures):
+                i, step_file = futures[future]
                 try:
-                    result = self.process_single_file(
-                        step_file, bom_base_dir, glb_base_dir, i, len(step_files)
-                    )
+                    result = future.result()
                     
-                    batch_summary.results.append(result)
+                    results_by_index[i] = result
                     batch_summary.processed_files += 1
                     
                     if not result.bom_error:
@@ -887,26 +1494,53 @@ class SequentialStepProcessor:
                     
                     if result.bom_error and result.glb_error:
                         batch_summary.failed_files.append(result.filename)
+                    if result.reused_outputs:
+                        batch_summary.skipped_files.append(result.filename)
                     
-                    if i < len(step_files):
-                        print(f"\n⏸️ Pausing 2 seconds before next file...")
-                        time.sleep(2)
-                        gc.collect()
+                    if not self.verbose:
+                        self._print_progress(batch_summary.processed_files, len(step_files), result)
+                    
+                    self._maybe_collect()
                     
-                except KeyboardInterrupt:
-                    print(f"\n❌ Processing interrupted by user at file {i}/{len(step_files)}")
-                    break
                 except Exception as e:
                     logger.error(f"Unexpected error processing {step_file}: {e}")
                     print(f"❌ Unexpected error: {e}")
                     batch_summary.failed_files.append(os.path.basename(step_file))
-                    continue
+                    self._stop_if_disk_full(e)
+                
+                if self._disk_full:
+                    # Set by a worker stage or the GLB publisher hitting ENOSPC
+                    print("❌ Output disk is full - stopping the batch")
+                    file_executor.shutdown(wait=False, cancel_futures=True)
+                    break
         
+        except KeyboardInterrupt:
+            print(f"\n❌ Processing interrupted by user after {batch_summary.processed_files}/{len(step_files)} files")
+            self._stop.set()
+            file_executor.shutdown(wait=False, cancel_futures=True)
         except Exception as e:
             print(f"❌ Batch processing error: {e}")
+        finally:
+            # In-flight files notice a stop within STOP_POLL_SECONDS, so this join is short
+            file_executor.shutdown(wait=True)
+            self.close()
         
-        batch_end_time = datetime.now()
-        batch_summary.total_duration = (batch_end_time - batch_start_time).total_seconds()
+        # Keep results in input order regardless of completion order
+        batch_summary.results.extend(results_by_index[i] for i in sorted(results_by_index))
+        
+        # GLBs that converted but could not be moved out of scratch count as failed
+        failed_moves = dict(self.glb_publisher.failed)
+        for result in batch_summary.results:
+            if result.glb_file_path in failed_moves:
+                result.glb_error = f"Could not write GLB to output: {failed_moves[result.glb_file_path]}"
+                result.glb_file_path = None
+                batch_summary.successful_glb -= 1
+                if result.bom_error:
+                    batch_summary.failed_files.append(result.filename)
+                self._output_cache.pop(result.content_hash, None)
+        self.save_output_cache()
+        
+        batch_summary.total_duration = time.perf_counter() - batch_t0
         
         self.print_batch_summary(batch_summary)
         
@@ -914,46 +1548,50 @@ class SequentialStepProcessor:
     
     def print_batch_summary(self, batch_summary: BatchSummary):
         """Print comprehensive batch processing summary."""
-        print(f"\n" + "=" * 60)
-        print("🎉 ENHANCED SEQUENTIAL PROCESSING COMPLETE")
-        print("=" * 60)
-        
-        print(f"📊 Overall Statistics:")
-        print(f"  • Total files: {batch_summary.total_files}")
-        print(f"  • Processed files: {batch_summary.processed_files}")
-        print(f"  • Successful BOM extractions: {batch_summary.successful_bom}")
-        print(f"  • Successful GLB conversions: {batch_summary.successful_glb}")
-        print(f"  • Failed files: {len(batch_summary.failed_files)}")
-        print(f"  • Total duration: {batch_summary.total_duration/60:.1f} minutes")
+        buf = io.StringIO()
+        out = partial(print, file=buf)
+        
+        out(_HDR_SUMMARY)
+        
+        out(f"📊 Overall Statistics:")
+        out(f"  • Total files: {batch_summary.total_files}")
+        out(f"  • Processed files: {batch_summary.processed_files}")
+        out(f"  • Successful BOM extractions: {batch_summary.successful_bom}")
+        out(f"  • Successful GLB conversions: {batch_summary.successful_glb}")
+        out(f"  • Failed files: {len(batch_summary.failed_files)}")
+        out(f"  • Unchanged (outputs reused): {len(batch_summary.skipped_files)}")
+        out(f"  • Total duration: {batch_summary.total_duration/60:.1f} minutes")
         
         if batch_summary.failed_files:
-            print(f"\n❌ Failed files:")
+            out(f"\n❌ Failed files:")
             for filename in batch_summary.failed_files:
-                print(f"  • {filename}")
+                out(f"  • {filename}")
         
         # Success rates
         total_operations = batch_summary.processed_files * 2
         successful_operations = batch_summary.successful_bom + batch_summary.successful_glb
         success_rate = (successful_operations / total_operations) * 100 if total_operations > 0 else 0
         
-        print(f"\n🎯 Overall Success Rate: {success_rate:.1f}%")
-        print(f"📋 BOM Success Rate: {(batch_summary.successful_bom / batch_summary.processed_files) * 100:.1f}%")
-        print(f"🌐 GLB Success Rate: {(batch_summary.successful_glb / batch_summary.processed_files) * 100:.1f}%")
+        out(f"\n🎯 Overall Success Rate: {success_rate:.1f}%")
+        out(f"📋 BOM Success Rate: {(batch_summary.successful_bom / batch_summary.processed_files) * 100:.1f}%")
+        out(f"🌐 GLB Success Rate: {(batch_summary.successful_glb / batch_summary.processed_files) * 100:.1f}%")
         
         if batch_summary.successful_bom > 0 or batch_summary.successful_glb > 0:
-            print(f"\n🚀 Processing completed with reference BOM extraction!")
-            print(f"🏷️ All output files have unique timestamps!")
-            print(f"📁 Check output folders:")
-            print(f"  • BOM files: output/bom/")
-            print(f"  • GLB files: output/web/")
+            out(f"\n🚀 Processing completed with reference BOM extraction!")
+            out(f"🏷️ All output files have unique timestamps!")
+            out(f"📁 Check output folders:")
+            out(f"  • BOM files: output/bom/")
+            out(f"  • GLB files: output/web/")
             
             # Show example filenames
             if batch_summary.results:
                 first_result = batch_summary.results[0]
-                print(f"\n📝 Example output filenames:")
-                print(f"  • BOM JSON: {first_result.unique_name}_bom.json")
+                out(f"\n📝 Example output filenames:")
+                out(f"  • BOM JSON: {first_result.unique_name}_bom.json")
                 if not first_result.glb_error:
-                    print(f"  • GLB Model: {first_result.unique_name}_model.glb")
+                    out(f"  • GLB Model: {first_result.unique_name}_model.glb")
+        
+        sys.stdout.write(buf.getvalue())
 
 def main():
     """Enhanced main function with reference BOM extraction and unique filenames."""
@@ -963,6 +1601,8 @@ def main():
     
     try:
         processor = SequentialStepProcessor()
+        # Module-level and OCC binding objects live for the whole run; keep them out of GC scans
+        gc.freeze()
         batch_summary = processor.process_all_files_sequentially(model_folder, bom_base_dir, glb_base_dir)
         
         if batch_summary.successful_bom > 0 or batch_summary.successful_glb > 0:
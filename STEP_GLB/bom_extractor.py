@@ -8,9 +8,16 @@ Converts STEP (.stp) files to JSON format and provides tools to analyze assembly
 import json
 import sys
 import os.path
-import glob
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import cached_property, lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional - fall back to stdlib json
+    orjson = None
+
 from OCC.Core.IFSelect import IFSelect_RetDone
 from OCC.Core.Quantity import Quantity_Color
 from OCC.Core.STEPCAFControl import STEPCAFControl_Reader
@@ -26,10 +33,21 @@ from OCC.Core.XCAFApp import XCAFApp_Application
 from OCC.Core.XCAFDoc import (XCAFDoc_DocumentTool_ShapeTool,
                               XCAFDoc_DocumentTool_ColorTool)
 
+from step_files import find_step_files, output_names, terminate_executor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
 logger = logging.getLogger(__name__)
 
+# Shared by every component without a color of its own
+_DEFAULT_COLOR = {'r': 128, 'g': 128, 'b': 128, 'hex': '#808080'}
+
+
+@lru_cache(maxsize=4096)
+def _color_hex(r, g, b):
+    """'#rrggbb' for an RGB triple; one shared string per color across documents."""
+    return f'#{r:02x}{g:02x}{b:02x}'
+
 
 class StandaloneTreeModel:
     """Standalone TreeModel replacement for OCAF document handling."""
@@ -62,8 +80,16 @@ class StepToJsonConverter:
     def __init__(self, filename, nextUID=0):
         self.filename = filename
         self._currentUID = nextUID
-        self.assyUidStack = [0]
-        self.assyLocStack = []
+        # Referred label tag -> (name, is_simple, is_assembly, color, shape_type)
+        self._ref_cache = {}
+        # getColor fills one Quantity_Color instead of allocating one per call, and parts
+        # with the same RGB share a single color dict
+        self._color_scratch = Quantity_Color()
+        self._color_cache = {(128, 128, 128): _DEFAULT_COLOR}
+        # Set from the document's color table in convert_to_json
+        self._has_any_color = True
+        # (tx, ty, tz, has_rotation, scale) -> serialized location shared by identical instances
+        self._location_cache = {}
         
     def getNewUID(self):
         """Generate sequential unique identifiers."""
@@ -81,31 +107,25 @@ class StepToJsonConverter:
 
     def getColor(self, shape):
         """Extract color information and convert to JSON-compatible format."""
+        # Documents without a single color definition can skip the OCAF lookup
+        if not self._has_any_color:
+            return _DEFAULT_COLOR
+        
+        # Default gray color if no color found or error occurred
+        rgb = (128, 128, 128)
         try:
-            color = Quantity_Color()
-            has_color = self.color_tool.GetColor(shape, XCAFDoc_ColorSurf, color)
-            
-            if has_color:
-                return {
-                    'r': int(color.Red() * 255),
-                    'g': int(color.Green() * 255),
-                    'b': int(color.Blue() * 255),
-                    'hex': '#{:02x}{:02x}{:02x}'.format(
-                        int(color.Red() * 255),
-                        int(color.Green() * 255),
-                        int(color.Blue() * 255)
-                    )
-                }
+            color = self._color_scratch
+            if self.color_tool.GetColor(shape, XCAFDoc_ColorSurf, color):
+                rgb = (int(color.Red() * 255), int(color.Green() * 255), int(color.Blue() * 255))
         except Exception as e:
             logger.debug(f"Failed to get color: {e}")
         
-        # Default gray color if no color found or error occurred
-        return {
-            'r': 128,
-            'g': 128,
-            'b': 128,
-            'hex': '#808080'
-        }
+        color_dict = self._color_cache.get(rgb)
+        if color_dict is None:
+            r, g, b = rgb
+            color_dict = {'r': r, 'g': g, 'b': b, 'hex': _color_hex(r, g, b)}
+            self._color_cache[rgb] = color_dict
+        return color_dict
 
     def serializeLocation(self, location):
         """Convert TopLoc_Location to JSON-serializable format."""
@@ -117,129 +137,168 @@ class StepToJsonConverter:
             trsf = location.Transformation()
             
             # Extract translation
-            translation = {
-                'x': float(trsf.TranslationPart().X()),
-                'y': float(trsf.TranslationPart().Y()),
-                'z': float(trsf.TranslationPart().Z())
-            }
+            xyz = trsf.TranslationPart()
+            tx, ty, tz = float(xyz.X()), float(xyz.Y()), float(xyz.Z())
             
-            # Check for rotation (simplified check)
-            has_rotation = not trsf.VectorialPart().IsEqual(trsf.VectorialPart(), 1e-7)
+            # Rotation present when the scale-free 3x3 part differs from identity; same
+            # rule as Sequential_STEP_Processor, so both write the same has_rotation
+            vp = trsf.HVectorialPart()
+            has_rotation = any(
+                abs(vp.Value(r, c) - (1.0 if r == c else 0.0)) > 1e-7
+                for r in (1, 2, 3) for c in (1, 2, 3)
+            )
+            scale_factor = float(trsf.ScaleFactor())
             
-            return {
-                'translation': translation,
-                'has_rotation': has_rotation,
-                'scale_factor': float(trsf.ScaleFactor())
-            }
+            key = (tx, ty, tz, has_rotation, scale_factor)
+            serialized = self._location_cache.get(key)
+            if serialized is None:
+                serialized = {
+                    'translation': {'x': tx, 'y': ty, 'z': tz},
+                    'has_rotation': has_rotation,
+                    'scale_factor': scale_factor
+                }
+                self._location_cache[key] = serialized
+            return serialized
         except Exception as e:
             logger.debug(f"Failed to serialize location: {e}")
             return None
 
-    def findComponents(self, label, comps):
-        """Recursively find and process assembly components."""
+    def findComponents(self, label, comps, parent_uid):
+        """Find and process assembly components depth-first with an explicit work stack.
+        
+        Returns a flat pre-order list of component dicts.
+        """
         components = []
+        # Entry dumps cross into OCC and allocate a str; only pay for them when debugging
+        DEBUG = logger.isEnabledFor(logging.DEBUG)
         
-        logger.debug(f"Processing {comps.Length()} components in label {label.EntryDumpToString()}")
+        # Frames are (label, comps, parent_uid, resume_index). Before descending into a
+        # sub-assembly the current frame is re-pushed at j+1, so output stays pre-order.
+        stack = [(label, comps, parent_uid, 0)]
         
-        for j in range(comps.Length()):
-            try:
-                cLabel = comps.Value(j+1)
-                cShape = self.shape_tool.GetShape(cLabel)
-                name = self.getName(cLabel)
-                
-                # Get component entry for debugging
-                component_entry = cLabel.EntryDumpToString()
-                logger.debug(f"Component {j+1}: {name} (Entry: {component_entry})")
-                
-                # Get referenced shape/assembly
-                refLabel = TDF_Label()
-                isRef = self.shape_tool.GetReferredShape(cLabel, refLabel)
-                
-                if isRef:
-                    refShape = self.shape_tool.GetShape(refLabel)
-                    refName = self.getName(refLabel)
-                    ref_entry = refLabel.EntryDumpToString()
+        while stack:
+            label, comps, parent_uid, start = stack.pop()
+            if DEBUG and start == 0:
+                logger.debug(f"Processing {comps.Length()} components in label {label.EntryDumpToString()}")
+            
+            for j in range(start, comps.Length()):
+                try:
+                    cLabel = comps.Value(j+1)
+                    cShape = self.shape_tool.GetShape(cLabel)
+                    name = self.getName(cLabel)
+                    
+                    # Get component entry for debugging
+                    component_entry = cLabel.EntryDumpToString() if DEBUG else ''
+                    if DEBUG:
+                        logger.debug(f"Component {j+1}: {name} (Entry: {component_entry})")
                     
-                    logger.debug(f"Reference: {refName} (Entry: {ref_entry})")
+                    # Get referenced shape/assembly
+                    refLabel = TDF_Label()
+                    isRef = self.shape_tool.GetReferredShape(cLabel, refLabel)
                     
-                    if self.shape_tool.IsSimpleShape(refLabel):
-                        # Process individual part/shape
-                        logger.debug(f"Processing simple shape: {refName}")
-                        color = self.getColor(refShape)
-                        location = self.shape_tool.GetLocation(cLabel)
+                    if isRef:
+                        ref_entry = refLabel.EntryDumpToString() if DEBUG else ''
+                        
+                        # A part or sub-assembly referenced many times (one bolt, 500 instances)
+                        # is resolved once; each instance only adds its own location and UID.
+                        # Referred shapes are direct children of the shapes label, so the tag
+                        # identifies the definition without dumping the entry string.
+                        refKey = refLabel.Tag()
+                        ref = self._ref_cache.get(refKey)
+                        if ref is None:
+                            refShape = self.shape_tool.GetShape(refLabel)
+                            is_simple = self.shape_tool.IsSimpleShape(refLabel)
+                            refName = self.getName(refLabel)
+                            ref = (
+                                # Distinct definitions often share a name (e.g. "Bolt")
+                                sys.intern(refName) if refName else refName,
+                                is_simple,
+                                not is_simple and self.shape_tool.IsAssembly(refLabel),
+                                self.getColor(refShape) if is_simple else None,
+                                self.getShapeTypeName(refShape) if is_simple else 'Assembly'
+                            )
+                            self._ref_cache[refKey] = ref
+                        refName, is_simple, is_assembly, color, shape_type = ref
+                        
+                        if DEBUG:
+                            logger.debug(f"Reference: {refName} (Entry: {ref_entry})")
+                        
+                        if is_simple:
+                            # Process individual part/shape
+                            if DEBUG:
+                                logger.debug(f"Processing simple shape: {refName}")
+                            location = self.shape_tool.GetLocation(cLabel)
+                            
+                            component = {
+                                'name': name or f"Component_{j+1}",
+                                'id': self.getNewUID(),
+                                'parent_id': parent_uid,
+                                'type': 'part',
+                                'is_assembly': False,
+                                'location': self.serializeLocation(location),
+                                'color': color,
+                                'shape_type': shape_type,
+                                'reference_name': refName or "Unnamed_Reference",
+                                'component_entry': component_entry,
+                                'reference_entry': ref_entry
+                            }
+                            components.append(component)
+                            
+                        elif is_assembly:
+                            # Process sub-assembly
+                            if DEBUG:
+                                logger.debug(f"Processing sub-assembly: {refName}")
+                            location = self.shape_tool.GetLocation(cLabel)
+                            newAssyUID = self.getNewUID()
+                            
+                            assembly = {
+                                'name': name or f"Assembly_{j+1}",
+                                'id': newAssyUID,
+                                'parent_id': parent_uid,
+                                'type': 'assembly',
+                                'is_assembly': True,
+                                'location': self.serializeLocation(location),
+                                'color': None,
+                                'shape_type': 'Assembly',
+                                'reference_name': refName or "Unnamed_Assembly",
+                                'component_entry': component_entry,
+                                'reference_entry': ref_entry
+                            }
+                            components.append(assembly)
+                            
+                            # Descend into sub-assembly components, resuming this level afterwards
+                            rComps = TDF_LabelSequence()
+                            subchilds = False
+                            self.shape_tool.GetComponents(refLabel, rComps, subchilds)
+                            
+                            if rComps.Length():
+                                stack.append((label, comps, parent_uid, j + 1))
+                                stack.append((refLabel, rComps, newAssyUID, 0))
+                                break
+                    else:
+                        # Component without reference - create fallback entry
+                        if DEBUG:
+                            logger.debug(f"Component without reference: {name}")
+                        color = self.getColor(cShape) if cShape else self.getColor(None)
                         
                         component = {
                             'name': name or f"Component_{j+1}",
                             'id': self.getNewUID(),
-                            'parent_id': self.assyUidStack[-1],
+                            'parent_id': parent_uid,
                             'type': 'part',
                             'is_assembly': False,
-                            'location': self.serializeLocation(location),
+                            'location': None,
                             'color': color,
-                            'shape_type': self.getShapeTypeName(refShape),
-                            'reference_name': refName or "Unnamed_Reference",
+                            'shape_type': self.getShapeTypeName(cShape) if cShape else 'Unknown',
+                            'reference_name': None,
                             'component_entry': component_entry,
-                            'reference_entry': ref_entry
+                            'reference_entry': None
                         }
                         components.append(component)
                         
-                    elif self.shape_tool.IsAssembly(refLabel):
-                        # Process sub-assembly
-                        logger.debug(f"Processing sub-assembly: {refName}")
-                        location = self.shape_tool.GetLocation(cLabel)
-                        self.assyLocStack.append(location)
-                        newAssyUID = self.getNewUID()
-                        
-                        assembly = {
-                            'name': name or f"Assembly_{j+1}",
-                            'id': newAssyUID,
-                            'parent_id': self.assyUidStack[-1],
-                            'type': 'assembly',
-                            'is_assembly': True,
-                            'location': self.serializeLocation(location),
-                            'color': None,
-                            'shape_type': 'Assembly',
-                            'reference_name': refName or "Unnamed_Assembly",
-                            'component_entry': component_entry,
-                            'reference_entry': ref_entry
-                        }
-                        components.append(assembly)
-                        
-                        # Recursively process sub-assembly components
-                        self.assyUidStack.append(newAssyUID)
-                        rComps = TDF_LabelSequence()
-                        subchilds = False
-                        isAssy = self.shape_tool.GetComponents(refLabel, rComps, subchilds)
-                        
-                        if rComps.Length():
-                            sub_components = self.findComponents(refLabel, rComps)
-                            components.extend(sub_components)
-                        
-                        self.assyUidStack.pop()
-                        self.assyLocStack.pop()
-                else:
-                    # Component without reference - create fallback entry
-                    logger.debug(f"Component without reference: {name}")
-                    color = self.getColor(cShape) if cShape else self.getColor(None)
-                    
-                    component = {
-                        'name': name or f"Component_{j+1}",
-                        'id': self.getNewUID(),
-                        'parent_id': self.assyUidStack[-1],
-                        'type': 'part',
-                        'is_assembly': False,
-                        'location': None,
-                        'color': color,
-                        'shape_type': self.getShapeTypeName(cShape) if cShape else 'Unknown',
-                        'reference_name': None,
-                        'component_entry': component_entry,
-                        'reference_entry': None
-                    }
-                    components.append(component)
-                    
-            except Exception as e:
-                logger.error(f"Error processing component {j+1}: {e}")
-                continue
+                except Exception as e:
+                    logger.error(f"Error processing component {j+1}: {e}")
+                    continue
         
         return components
 
@@ -289,6 +348,10 @@ class StepToJsonConverter:
 
             logger.info("Transferring STEP data to OCAF document...")
             step_reader.Transfer(tmodel.doc)
+            
+            colors = TDF_LabelSequence()
+            self.color_tool.GetColors(colors)
+            self._has_any_color = colors.Length() > 0
 
             # Get root labels
             labels = TDF_LabelSequence()
@@ -316,6 +379,7 @@ class StepToJsonConverter:
                 name = os.path.splitext(os.path.basename(self.filename))[0]
                 
             isAssy = self.shape_tool.IsAssembly(rootlabel)
+            DEBUG = logger.isEnabledFor(logging.DEBUG)
             
             assembly_tree = []
 
@@ -323,7 +387,6 @@ class StepToJsonConverter:
                 # Process as assembly structure
                 logger.info(f"Processing assembly: {name}")
                 topLoc = self.shape_tool.GetLocation(rootlabel)
-                self.assyLocStack.append(topLoc)
                 
                 newAssyUID = self.getNewUID()
                 root_assembly = {
@@ -336,18 +399,17 @@ class StepToJsonConverter:
                     'color': None,
                     'shape_type': 'Assembly',
                     'is_root': True,
-                    'root_entry': rootlabel.EntryDumpToString()
+                    'root_entry': rootlabel.EntryDumpToString() if DEBUG else ''
                 }
                 assembly_tree.append(root_assembly)
                 
-                self.assyUidStack.append(newAssyUID)
                 topComps = TDF_LabelSequence()
                 subchilds = False
                 isAssy = self.shape_tool.GetComponents(rootlabel, topComps, subchilds)
                 
                 logger.info(f"Root assembly has {topComps.Length()} components")
                 if topComps.Length():
-                    components = self.findComponents(rootlabel, topComps)
+                    components = self.findComponents(rootlabel, topComps, newAssyUID)
                     assembly_tree.extend(components)
             else:
                 # Process individual parts at root level
@@ -365,7 +427,6 @@ class StepToJsonConverter:
                     'is_root': True
                 }
                 assembly_tree.append(root_container)
-                self.assyUidStack = [newAssyUID]
                 
                 for j in range(labels.Length()):
                     label = labels.Value(j+1)
@@ -379,13 +440,13 @@ class StepToJsonConverter:
                     part = {
                         'name': name,
                         'id': self.getNewUID(),
-                        'parent_id': self.assyUidStack[-1],
+                        'parent_id': newAssyUID,
                         'type': 'part',
                         'is_assembly': False,
                         'location': None,
                         'color': color,
                         'shape_type': shape_type,
-                        'label_entry': label.EntryDumpToString()
+                        'label_entry': label.EntryDumpToString() if DEBUG else ''
                     }
                     assembly_tree.append(part)
 
@@ -418,94 +479,150 @@ class BOMAnalyzer:
     """Analyze BOM data and provide hierarchy tools."""
     
     def __init__(self, bom_file_path):
-        with open(bom_file_path, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        self.data = load_bom_json(bom_file_path)
         self.assembly_tree = self.data['assembly_tree']
-        self.items_by_id = {item['id']: item for item in self.assembly_tree}
+        self.items_by_id = {}
+        
+        # Id index and parent id -> direct children in assembly_tree order, in one pass
+        self._children_by_parent = {}
+        for item in self.assembly_tree:
+            self.items_by_id[item['id']] = item
+            self._children_by_parent.setdefault(item['parent_id'], []).append(item)
+        # Item id -> root-to-item path tuple, filled in by get_path_to_root
+        self._path_cache = {}
+    
+    # Column lists of the fields the scans read (index i describes assembly_tree[i]),
+    # built on first use so callers that never scan don't pay for them
+    @cached_property
+    def is_assembly(self):
+        return [item['is_assembly'] for item in self.assembly_tree]
+    
+    @cached_property
+    def names(self):
+        return [item['name'] for item in self.assembly_tree]
+    
+    @cached_property
+    def _names_lower(self):
+        # Lowercased once so case-insensitive searches don't re-lower every name per query
+        return [name.lower() for name in self.names]
     
     def find_children(self, parent_id):
         """Find all direct children of a given parent."""
-        children = []
-        for item in self.assembly_tree:
-            if item['parent_id'] == parent_id:
-                children.append(item)
-        return children
+        return list(self._children_by_parent.get(parent_id, ()))
     
     def find_all_descendants(self, parent_id):
         """Find all descendants (children, grandchildren, etc.) of a given parent."""
         descendants = []
-        children = self.find_children(parent_id)
+        children_by_parent = self._children_by_parent
+        # Children are pushed reversed so they pop in order, keeping the pre-order result
+        stack = list(reversed(children_by_parent.get(parent_id, ())))
         
-        for child in children:
-            descendants.append(child)
-            # Recursively find descendants of this child
-            descendants.extend(self.find_all_descendants(child['id']))
+        while stack:
+            item = stack.pop()
+            descendants.append(item)
+            stack.extend(reversed(children_by_parent.get(item['id'], ())))
         
         return descendants
     
     def get_path_to_root(self, target_id):
         """Get the complete path from target item to root."""
-        path = []
-        current_id = target_id
+        path_cache = self._path_cache
         
-        while current_id is not None:
+        # Climb only until an ancestor whose path is already known
+        chain = []
+        current_id = target_id
+        while current_id is not None and current_id not in path_cache:
             current_item = self.items_by_id.get(current_id)
             if not current_item:
                 break
-            path.append(current_item)
+            chain.append(current_item)
             current_id = current_item['parent_id']
         
-        return path[::-1]  # Reverse to show root-to-target
+        # Extend the known path back down (root-to-target), caching every node on the way
+        path = path_cache.get(current_id, ())
+        for current_item in reversed(chain):
+            path = path + (current_item,)
+            path_cache[current_item['id']] = path
+        
+        return list(path)
     
     def build_hierarchy_tree(self):
         """Build a nested tree structure from flat array."""
-        # Add children list to each item
-        for item in self.assembly_tree:
-            item['children'] = []
-        
-        # Build parent-child relationships
-        root_items = []
+        # Children come straight from the index; copies keep callers from editing it
+        children_by_parent = self._children_by_parent
         for item in self.assembly_tree:
-            if item['parent_id'] is None:
-                root_items.append(item)
-            else:
-                parent = self.items_by_id.get(item['parent_id'])
-                if parent:
-                    parent['children'].append(item)
+            item['children'] = list(children_by_parent.get(item['id'], ()))
         
-        return root_items
+        return list(children_by_parent.get(None, ()))
     
     def print_tree(self, items=None, level=0):
-        """Recursively print the tree structure."""
+        """Print the tree structure depth-first, written to stdout in one call."""
         if items is None:
-            items = [item for item in self.assembly_tree if item['parent_id'] is None]
+            items = self._children_by_parent.get(None, [])
         
         if not isinstance(items, list):
             items = [items]
         
-        for item in items:
-            indent = "  " * level
+        children_by_parent = self._children_by_parent
+        indents = []
+        lines = []
+        # Children are pushed reversed so they pop in their original order
+        stack = [(item, level) for item in reversed(items)]
+        
+        while stack:
+            item, depth = stack.pop()
+            while len(indents) <= depth:
+                indents.append("  " * len(indents))
+            
             icon = "📁" if item['is_assembly'] else "🔧"
             color_info = ""
             if item.get('color') and item['color']['hex'] != '#808080':
                 color_info = f" [{item['color']['hex']}]"
             
-            print(f"{indent}{icon} {item['name']} (ID: {item['id']}){color_info}")
+            lines.append(f"{indents[depth]}{icon} {item['name']} (ID: {item['id']}){color_info}")
             
-            # Print children
-            children = self.find_children(item['id'])
-            if children:
-                self.print_tree(children, level + 1)
+            stack.extend((child, depth + 1) for child in reversed(children_by_parent.get(item['id'], ())))
+        
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+    
+    def _subtree_counts(self):
+        """Parts and sub-assemblies below every item, from one bottom-up pass.
+        
+        Returns (parts, assemblies) dicts keyed by item id; the item itself is not counted.
+        """
+        children_by_parent = self._children_by_parent
+        
+        # Pre-order from the roots (and any orphans); walked backwards, every child
+        # comes before its parent
+        order = []
+        stack = [item for item in self.assembly_tree if item['parent_id'] not in self.items_by_id]
+        while stack:
+            item = stack.pop()
+            order.append(item)
+            stack.extend(children_by_parent.get(item['id'], ()))
+        
+        parts = {}
+        assemblies = {}
+        for item in reversed(order):
+            n_parts = 0
+            n_assemblies = 0
+            for child in children_by_parent.get(item['id'], ()):
+                child_id = child['id']
+                n_parts += parts[child_id]
+                n_assemblies += assemblies[child_id]
+                if child['is_assembly']:
+                    n_assemblies += 1
+                else:
+                    n_parts += 1
+            parts[item['id']] = n_parts
+            assemblies[item['id']] = n_assemblies
+        
+        return parts, assemblies
     
     def analyze_assembly_structure(self):
         """Analyze the assembly structure and print statistics."""
-        children_count = {}
-        
-        for item in self.assembly_tree:
-            parent_id = item['parent_id']
-            if parent_id not in children_count:
-                children_count[parent_id] = 0
-            children_count[parent_id] += 1
+        part_counts, assy_counts = self._subtree_counts()
         
         print("\n" + "="*50)
         print("ASSEMBLY STRUCTURE ANALYSIS")
@@ -520,10 +637,9 @@ class BOMAnalyzer:
         
         for item in self.assembly_tree:
             if item['is_assembly']:
-                child_count = children_count.get(item['id'], 0)
-                descendants = self.find_all_descendants(item['id'])
-                part_count = sum(1 for d in descendants if not d['is_assembly'])
-                assy_count = sum(1 for d in descendants if d['is_assembly'])
+                child_count = len(self._children_by_parent.get(item['id'], ()))
+                part_count = part_counts.get(item['id'], 0)
+                assy_count = assy_counts.get(item['id'], 0)
                 
                 print(f"{item['name']}:")
                 print(f"  • Direct children: {child_count}")
@@ -533,24 +649,21 @@ class BOMAnalyzer:
     
     def search_by_name(self, search_term, case_sensitive=False):
         """Search for items by name."""
-        results = []
-        search_term = search_term if case_sensitive else search_term.lower()
+        if case_sensitive:
+            names = self.names
+        else:
+            names = self._names_lower
+            search_term = search_term.lower()
         
-        for item in self.assembly_tree:
-            name = item['name']
-            name_to_search = name if case_sensitive else name.lower()
-            
-            if search_term in name_to_search:
-                results.append(item)
-        
-        return results
+        tree = self.assembly_tree
+        return [tree[i] for i, name in enumerate(names) if search_term in name]
     
     def get_parts_list(self):
         """Get a list of all parts (non-assemblies) with their full paths."""
         parts = []
         
-        for item in self.assembly_tree:
-            if not item['is_assembly']:
+        for item, is_assembly in zip(self.assembly_tree, self.is_assembly):
+            if not is_assembly:
                 path = self.get_path_to_root(item['id'])
                 path_names = [p['name'] for p in path]
                 
@@ -585,32 +698,43 @@ def save_bom_json(assembly_data, output_dir='output/bom', filename='bom_data.jso
     }
     
     # Save to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(bom_data, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        # orjson encodes straight to UTF-8 bytes without building an intermediate str
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(bom_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(bom_data, f, indent=2, ensure_ascii=False)
     
     print(f"✅ BOM saved to: {output_file}")
     return output_file
 
 
+def load_bom_json(bom_file_path):
+    """Load a BOM JSON file, using orjson when available."""
+    if orjson is not None:
+        with open(bom_file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(bom_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_step_files_in_model_folder(model_folder="model"):
+    """Find all STEP files in the model folder"""
+    return find_step_files(model_folder)
+
+
 def find_step_file_in_model_folder():
     """Find STEP files in the model folder"""
-    model_folder = "model"
-    
-    if not os.path.exists(model_folder):
-        return None
-    
-    # Look for STEP files with common extensions
-    step_extensions = ['*.step', '*.stp', '*.STEP', '*.STP']
-    step_files = []
-    
-    for extension in step_extensions:
-        step_files.extend(glob.glob(os.path.join(model_folder, extension)))
-    
-    if not step_files:
-        return None
+    step_files = find_step_files_in_model_folder()
     
     # Return the first STEP file found
-    return step_files[0]
+    return step_files[0] if step_files else None
+
+
+def _extract_one(input_step_file, output_dir):
+    """Process-pool entry point: each worker builds its own OCAF document and reader."""
+    return BOMExtractor().extract_bom_data(input_step_file, output_dir)
 
 
 class BOMExtractor:
@@ -679,6 +803,51 @@ class BOMExtractor:
                 "total_parts": 0,
                 "total_assemblies": 0
             }
+    
+    def extract_bom_batch(self, step_files, output_dir, max_workers=None):
+        """
+        Extract BOM data from several STEP files in parallel worker processes.
+        
+        Each file is written to its own subdirectory of output_dir, named after the file
+        (with its extension appended when another file has the same stem).
+        
+        Args:
+            step_files (list): Paths of the STEP files to process
+            output_dir (str): Parent output directory
+            max_workers (int): Worker processes (default: one per CPU)
+            
+        Returns:
+            dict: STEP file path -> result dictionary as returned by extract_bom_data
+        """
+        if not step_files:
+            return {}
+        
+        max_workers = min(max_workers or os.cpu_count() or 1, len(step_files))
+        results = {}
+        
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                step_file: executor.submit(_extract_one, step_file, os.path.join(output_dir, name))
+                for step_file, name in zip(step_files, output_names(step_files))
+            }
+            for step_file, future in futures.items():
+                try:
+                    results[step_file] = future.result()
+                except Exception as e:
+                    # A crashed worker surfaces here rather than inside extract_bom_data
+                    results[step_file] = {
+                        "error": f"BOM extraction failed: {str(e)}",
+                        "total_parts": 0,
+                        "total_assemblies": 0
+                    }
+        except KeyboardInterrupt:
+            # Drop the queue and kill running workers so Ctrl-C returns promptly
+            terminate_executor(executor)
+            raise
+        
+        executor.shutdown()
+        return results
 
 
 def main():
@@ -692,14 +861,34 @@ def main():
     print("🔧 STEP to BOM JSON Converter")
     print("=" * 40)
     
-    # Find STEP file in model folder
-    step_file = find_step_file_in_model_folder()
+    # Find STEP files in model folder
+    step_files = find_step_files_in_model_folder()
     
-    if not step_file:
+    if not step_files:
         print(f"❌ No STEP files found in '{model_folder}' folder")
         print(f"📁 Please place your STEP file (.stp or .step) in the '{model_folder}' directory")
         return 1
     
+    if len(step_files) > 1:
+        print(f"📂 Found {len(step_files)} STEP files, extracting in parallel")
+        print(f"📁 Output directory: {output_dir}")
+        try:
+            results = BOMExtractor().extract_bom_batch(step_files, output_dir)
+        except KeyboardInterrupt:
+            print("\n❌ Conversion cancelled by user")
+            return 1
+        
+        failed = 0
+        for step_file, result in results.items():
+            if "error" in result:
+                failed += 1
+                print(f"❌ {os.path.basename(step_file)}: {result['error']}")
+            else:
+                print(f"✅ {os.path.basename(step_file)}: {result['total_parts']} parts, "
+                      f"{result['total_assemblies']} assemblies -> {result['output_file']}")
+        return 1 if failed else 0
+    
+    step_file = step_files[0]
     print(f"📂 Found STEP file: {step_file}")
     print(f"📁 Output directory: {output_dir}")
     print(f"📄 Output filename: {output_filename}")
@@ -0,0 +1,62 @@
+"""STEP file discovery and worker-pool helpers shared by the BOM extractor, web converter
+and batch processor"""
+
+import os
+from collections import Counter
+
+STEP_EXTENSIONS = ('.step', '.stp')
+
+
+def _step_entries(model_folder):
+    """DirEntry for every STEP file in model_folder, sorted by name; [] if it is missing."""
+    # One directory read; lower() also catches mixed-case extensions like .Step
+    try:
+        with os.scandir(model_folder) as it:
+            entries = [e for e in it if e.is_file() and e.name.lower().endswith(STEP_EXTENSIONS)]
+    except FileNotFoundError:
+        return []
+    
+    entries.sort(key=lambda e: e.name.lower())
+    return entries
+
+
+def find_step_files(model_folder="model"):
+    """Paths of all STEP files in model_folder, sorted by name."""
+    return [e.path for e in _step_entries(model_folder)]
+
+
+def scan_step_files(model_folder="model"):
+    """(path, size_bytes, mtime) for every STEP file, sorted by name.
+    
+    Sizes and mtimes come from the same os.scandir pass, so callers don't stat again.
+    """
+    step_files = []
+    for e in _step_entries(model_folder):
+        st = e.stat()
+        step_files.append((e.path, st.st_size, st.st_mtime))
+    return step_files
+
+
+def output_names(step_files):
+    """Per-file output name: the stem, plus the extension where stems collide (a.step/a.stp)."""
+    stems = [os.path.splitext(os.path.basename(step_file))[0] for step_file in step_files]
+    # Compared case-insensitively since output dirs may be on a case-insensitive filesystem
+    counts = Counter(stem.lower() for stem in stems)
+    return [stem if counts[stem.lower()] == 1 else f"{stem}_{os.path.splitext(step_file)[1][1:]}"
+            for stem, step_file in zip(stems, step_files)]
+
+
+def terminate_executor(executor):
+    """Cancel queued work and kill a ProcessPoolExecutor's workers, waiting until they exit.
+    
+    For OCC/cascadio calls, which can't be interrupted; a plain shutdown would let every
+    running and queued task finish first.
+    """
+    # ProcessPoolExecutor has no public way to stop a running task, so this relies on the
+    # private _processes map (pid -> Process); collect it before shutdown clears it
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
@@ -2,84 +2,614 @@
 
 import os
 import sys
-import glob
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+import shutil
+import logging
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, field
+
+from step_files import find_step_files, output_names, terminate_executor
+
+try:
+    import cascadio
+except ImportError:
+    cascadio = None
+
+try:
+    import numpy as np
+except ImportError:  # optional - only needed by the built-in quantizer
+    np = None
+
+try:
+    import pygltflib
+except ImportError:  # optional - only needed by the built-in quantizer
+    pygltflib = None
+
+logger = logging.getLogger(__name__)
+
+# gltfpack (meshoptimizer CLI) is optional; without it GLBs are left unquantized
+_GLTFPACK = shutil.which("gltfpack")
+# Position / texcoord / normal bits for KHR_mesh_quantization
+QUANTIZE_BITS = {"-vp": 14, "-vt": 12, "-vn": 8}
+# -sa lets the simplifier ignore topology; off so CAD edges and holes survive
+SIMPLIFY_AGGRESSIVE = False
+# Inward vertex offset for shrink=True, as a fraction of each primitive's bbox diagonal
+SHRINK_RATIO = 1e-4
+
+
+# glTF accessor component types / buffer targets used by the built-in quantizer
+_BYTE, _UNSIGNED_SHORT, _FLOAT = 5120, 5123, 5126
+_ARRAY_BUFFER = 34962
+_COMPONENT_DTYPES = {5120: '<i1', 5121: '<u1', 5122: '<i2', 5123: '<u2', 5125: '<u4', 5126: '<f4'}
+_TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT2": 4, "MAT3": 9, "MAT4": 16}
+# Inputs that already carry compressed or quantized geometry are left alone
+_PACKED_EXTENSIONS = {"KHR_mesh_quantization", "KHR_draco_mesh_compression", "EXT_meshopt_compression"}
+
+
+def _prefetch(path):
+    """Ask the kernel to start reading path into the page cache ahead of the converter."""
+    # cascadio opens the file itself, so a per-fd SEQUENTIAL hint would not reach its
+    # reads; WILLNEED fills the shared page cache instead. Linux/POSIX only.
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _step_to_glb_worker(input_path, glb_path, conn):
+    """Child-process entry point: run cascadio and send back an error message or None."""
+    try:
+        cascadio.step_to_glb(input_path, glb_path)
+        conn.send(None)
+    except Exception as e:
+        conn.send(str(e))
+    finally:
+        conn.close()
+
+
+def _step_to_glb_isolated(input_path, glb_path):
+    """Run cascadio.step_to_glb in a child process that Ctrl-C can actually stop.
+    
+    The OCCT call does not return to Python until it finishes, so KeyboardInterrupt
+    is only seen here in the parent, which then terminates the child. Process exit
+    also hands OCCT's B-Rep arenas back to the OS.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_step_to_glb_worker,
+                                      args=(input_path, glb_path, sender), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        error = receiver.recv()
+    except EOFError:
+        # Child died without reporting (crash or OOM kill)
+        error = None
+    except BaseException:
+        process.terminate()
+        process.join()
+        # A half-written GLB would look newer than the STEP file on the next run
+        if os.path.exists(glb_path):
+            os.remove(glb_path)
+        raise
+    finally:
+        receiver.close()
+    
+    process.join()
+    if error:
+        raise RuntimeError(error)
+    if process.exitcode != 0:
+        raise RuntimeError(f"cascadio worker exited with code {process.exitcode}")
+
+
+def _accessor_view(gltf, blob, accessor):
+    """(count, n) array viewing an accessor's elements in the GLB binary chunk (no copy)."""
+    view = gltf.bufferViews[accessor.bufferView]
+    dtype = np.dtype(_COMPONENT_DTYPES[accessor.componentType])
+    n = _TYPE_SIZES[accessor.type]
+    stride = view.byteStride or dtype.itemsize * n
+    offset = (view.byteOffset or 0) + (accessor.byteOffset or 0)
+    return np.ndarray((accessor.count, n), dtype=dtype, buffer=blob, offset=offset,
+                      strides=(stride, dtype.itemsize))
+
+
+def _read_accessor(gltf, blob, accessor):
+    """Copy an accessor's elements out of the GLB binary chunk as a (count, n) array."""
+    return _accessor_view(gltf, blob, accessor).copy()
+
+
+def _vertex_normals(positions, indices):
+    """Area-weighted per-vertex normals of a triangle list, accumulated with bincount."""
+    triangles = indices[:len(indices) - len(indices) % 3].reshape(-1, 3).astype(np.intp)
+    p0, p1, p2 = (positions[triangles[:, k]] for k in range(3))
+    # Unnormalized cross product = normal scaled by twice the triangle area
+    face = np.cross(p1 - p0, p2 - p0)
+    corners = triangles.ravel()
+    normals = np.empty(positions.shape, dtype=np.float32)
+    for c in range(3):
+        normals[:, c] = np.bincount(corners, weights=np.repeat(face[:, c], 3),
+                                    minlength=len(positions))
+    return normals
+
+
+def _shrink_glb(glb_path, ratio=SHRINK_RATIO):
+    """Move every vertex inward by ratio * bbox diagonal along its normal, in place.
+    
+    Overlapping solids in STEP assemblies z-fight and overdraw; pulling each surface
+    slightly inside its solid removes the coplanar overlap. Normals come from the
+    NORMAL attribute, or are computed from the triangles when it is missing. The
+    offset is far below a pixel at normal viewing distances, so the seams it opens
+    between faces with split vertices stay invisible. Needs numpy and pygltflib;
+    returns False without touching the file when they are missing.
+    """
+    if np is None or pygltflib is None:
+        return False
+    
+    gltf = pygltflib.GLTF2().load(glb_path)
+    blob = gltf.binary_blob()
+    if (not blob or not gltf.meshes or len(gltf.buffers) != 1
+            or _PACKED_EXTENSIONS.intersection(gltf.extensionsUsed or ())
+            or any(accessor.sparse for accessor in gltf.accessors)):
+        return False
+    
+    data = bytearray(blob)
+    shrunk = set()
+    for mesh in gltf.meshes:
+        for primitive in mesh.primitives:
+            i = primitive.attributes.POSITION
+            # Only float triangle lists; an accessor shared by primitives moves once
+            if (i is None or i in shrunk or primitive.mode not in (None, 4)
+                    or gltf.accessors[i].componentType != _FLOAT):
+                continue
+            accessor = gltf.accessors[i]
+            positions = _accessor_view(gltf, data, accessor)
+            if not len(positions):
+                continue
+            
+            normal_index = primitive.attributes.NORMAL
+            if normal_index is not None and gltf.accessors[normal_index].componentType == _FLOAT:
+                normals = _read_accessor(gltf, data, gltf.accessors[normal_index])
+            else:
+                if primitive.indices is not None:
+                    indices = _accessor_view(gltf, data, gltf.accessors[primitive.indices]).ravel()
+                else:
+                    indices = np.arange(len(positions))
+                normals = _vertex_normals(positions, indices)
+            length = np.sqrt(np.einsum('ij,ij->i', normals, normals))
+            length[length == 0] = 1.0
+            
+            lo, hi = positions.min(axis=0), positions.max(axis=0)
+            eps = ratio * float(np.linalg.norm(hi - lo))
+            # Written straight through the view into the binary chunk
+            positions -= normals * (eps / length)[:, None]
+            accessor.min = positions.min(axis=0).tolist()
+            accessor.max = positions.max(axis=0).tolist()
+            shrunk.add(i)
+    
+    if not shrunk:
+        return False
+    
+    gltf.set_binary_blob(bytes(data))
+    tmp_path = glb_path + ".shrunk.glb"
+    try:
+        gltf.save_binary(tmp_path)
+        os.replace(tmp_path, glb_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def _encode_normals(normals, step):
+    """Encode a (V, 3) float32 normal array as padded normalized int8 VEC3 bytes.
+    
+    Whole-array NumPy ops working in place on the copy from _read_accessor, so the
+    pass stays bound by the final buffer write rather than per-vertex Python work.
+    Normals are first scaled by the grid step so the renderer's inverse-transpose
+    of the dequantization matrix maps them back to the original directions.
+    """
+    normals *= step
+    length = np.sqrt(np.einsum('ij,ij->i', normals, normals))
+    length[length == 0] = 1.0
+    normals *= (127.0 / length)[:, None]
+    padded = np.zeros((len(normals), 4), dtype='<i1')
+    np.rint(normals, out=normals)
+    padded[:, :3] = normals
+    return padded.tobytes()
+
+
+def _quantize_glb(glb_path):
+    """Quantize POSITION to uint16 and NORMAL to int8 in place (KHR_mesh_quantization).
+    
+    Positions of every mesh share one global per-axis grid, so parts that meet in the
+    source still meet after quantization (no cracks). The grid's offset and step are
+    undone by a matrix on a new child node holding each mesh; the child takes the
+    original node's name so viewers that pick parts by name still find them. TEXCOORD
+    and any other attributes stay float. Needs numpy and pygltflib; returns False without
+    touching the file when they are missing, the GLB has no non-empty POSITION data, or
+    it uses features this pass does not handle (skins, morph targets, sparse accessors).
+    """
+    if np is None or pygltflib is None:
+        return False
+    
+    gltf = pygltflib.GLTF2().load(glb_path)
+    blob = gltf.binary_blob()
+    if (not blob or not gltf.meshes or len(gltf.buffers) != 1 or gltf.skins
+            or _PACKED_EXTENSIONS.intersection(gltf.extensionsUsed or ())
+            or any(accessor.sparse for accessor in gltf.accessors)):
+        return False
+    
+    positions, normals = set(), set()
+    for mesh in gltf.meshes:
+        for primitive in mesh.primitives:
+            if primitive.targets:
+                return False
+            attributes = primitive.attributes
+            if attributes.POSITION is not None:
+                positions.add(attributes.POSITION)
+            if attributes.NORMAL is not None:
+                normals.add(attributes.NORMAL)
+    # Every mesh gets the dequantization matrix, so every position must be quantized
+    if not positions or any(gltf.accessors[i].componentType != _FLOAT for i in positions):
+        return False
+    
+    # Zero-copy (count, 3) float32 views over the binary chunk; every pass below is a
+    # whole-array ufunc on them rather than per-vertex Python
+    position_views = {i: _accessor_view(gltf, blob, gltf.accessors[i]) for i in positions}
+    bounds = []
+    for i, view in position_views.items():
+        accessor = gltf.accessors[i]
+        if not len(view):
+            continue
+        # POSITION min/max are mandatory in glTF, which saves a pass over the data
+        if accessor.min and accessor.max:
+            bounds.append((accessor.min, accessor.max))
+        else:
+            bounds.append((view.min(axis=0), view.max(axis=0)))
+    if not bounds:
+        return False
+    lo = np.min([b[0] for b in bounds], axis=0).astype(np.float32)
+    hi = np.max([b[1] for b in bounds], axis=0).astype(np.float32)
+    step = (hi - lo) / np.float32(65535.0)
+    step[step == 0] = 1.0
+    inverse_step = np.float32(1.0) / step
+    
+    # Accessor index -> (tightly packed bytes, byteStride); attribute strides must be
+    # multiples of 4, so VEC3 elements are padded to 4 components
+    packed = {}
+    for i, view in position_views.items():
+        scaled = view - lo
+        scaled *= inverse_step
+        np.rint(scaled, out=scaled)
+        np.clip(scaled, 0, 65535, out=scaled)
+        padded = np.zeros((len(view), 4), dtype='<u2')
+        padded[:, :3] = scaled
+        accessor = gltf.accessors[i]
+        accessor.componentType = _UNSIGNED_SHORT
+        accessor.normalized = False
+        if len(view):
+            accessor.min = padded[:, :3].min(axis=0).tolist()
+            accessor.max = padded[:, :3].max(axis=0).tolist()
+        packed[i] = (padded.tobytes(), 8)
+    
+    for i in normals:
+        accessor = gltf.accessors[i]
+        if accessor.componentType != _FLOAT or i in packed:
+            continue
+        packed[i] = (_encode_normals(_read_accessor(gltf, blob, accessor), step), 4)
+        accessor.componentType = _BYTE
+        accessor.normalized = True
+        accessor.min = None
+        accessor.max = None
+    
+    # Rebuild the binary chunk: views still referenced are copied, views that only
+    # fed replaced accessors are dropped, and each quantized accessor gets its own view
+    used_views = {accessor.bufferView for i, accessor in enumerate(gltf.accessors)
+                  if i not in packed and accessor.bufferView is not None}
+    used_views.update(image.bufferView for image in gltf.images if image.bufferView is not None)
+    
+    out = bytearray()
+    views = []
+    
+    def add_view(data, byte_stride=None, target=None):
+        out.extend(b'\0' * (-len(out) % 4))
+        views.append(pygltflib.BufferView(buffer=0, byteOffset=len(out), byteLength=len(data),
+                                          byteStride=byte_stride, target=target))
+        out.extend(data)
+        return len(views) - 1
+    
+    remap = {}
+    for j, view in enumerate(gltf.bufferViews):
+        if j in used_views:
+            start = view.byteOffset or 0
+            remap[j] = add_view(blob[start:start + view.byteLength], view.byteStride, view.target)
+    for i, accessor in enumerate(gltf.accessors):
+        if i in packed:
+            data, byte_stride = packed[i]
+            accessor.bufferView = add_view(data, byte_stride, _ARRAY_BUFFER)
+            accessor.byteOffset = 0
+        elif accessor.bufferView is not None:
+            accessor.bufferView = remap[accessor.bufferView]
+    for image in gltf.images:
+        if image.bufferView is not None:
+            image.bufferView = remap[image.bufferView]
+    
+    gltf.bufferViews = views
+    gltf.buffers[0].byteLength = len(out)
+    gltf.set_binary_blob(bytes(out))
+    
+    # p = lo + q * step, column-major; a child node keeps the parent's own transform
+    # and children untouched
+    matrix = [float(step[0]), 0.0, 0.0, 0.0,
+              0.0, float(step[1]), 0.0, 0.0,
+              0.0, 0.0, float(step[2]), 0.0,
+              float(lo[0]), float(lo[1]), float(lo[2]), 1.0]
+    for node in list(gltf.nodes):
+        if node.mesh is not None:
+            gltf.nodes.append(pygltflib.Node(name=node.name, mesh=node.mesh, matrix=list(matrix)))
+            node.mesh = None
+            node.children = (node.children or []) + [len(gltf.nodes) - 1]
+    
+    for names in ("extensionsUsed", "extensionsRequired"):
+        current = getattr(gltf, names) or []
+        if "KHR_mesh_quantization" not in current:
+            setattr(gltf, names, current + ["KHR_mesh_quantization"])
+    
+    tmp_path = glb_path + ".quantized.glb"
+    try:
+        gltf.save_binary(tmp_path)
+        os.replace(tmp_path, glb_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
 
 
 @dataclass
 class WebAssetsData:
     """Data structure for web assets"""
     glb_file: Optional[str] = None
+    glb_path: Optional[str] = None
     file_size: int = 0
     format: str = ""
     three_js_compatible: bool = False
     conversion_unavailable: Optional[str] = None
     conversion_error: Optional[str] = None
+    extensions: List[str] = field(default_factory=list)
+    lod_files: List[str] = field(default_factory=list)
+    compression: Optional[str] = None
+    reused: bool = False
 
 
 class WebConverter:
     """Converts STP files to web-ready formats"""
     
     def __init__(self):
-        self.cascadio_available = self._check_cascadio()
+        self.cascadio_available = cascadio is not None
     
-    def _check_cascadio(self) -> bool:
-        """Check if cascadio is available"""
+    def _gltfpack(self, glb_path: str, args: List[str], output_path: Optional[str] = None) -> bool:
+        """Run gltfpack on glb_path (in place unless output_path); False if unavailable or failed."""
+        if not _GLTFPACK:
+            return False
+        
+        output_path = output_path or glb_path
+        tmp_path = output_path + ".packed.glb"
         try:
-            import cascadio
+            # -kn/-km keep named nodes and materials: by default gltfpack merges them,
+            # and the viewer maps meshes to BOM entries by node name
+            subprocess.run([_GLTFPACK, "-i", glb_path, "-o", tmp_path, "-kn", "-km"] + args,
+                           check=True, capture_output=True)
+            os.replace(tmp_path, output_path)
             return True
-        except ImportError:
+        except (OSError, subprocess.CalledProcessError):
+            # Keep the GLB as it was rather than failing the conversion
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+    
+    def _quantize_args(self) -> List[str]:
+        """gltfpack flags for the QUANTIZE_BITS precisions"""
+        args = []
+        for flag, bits in QUANTIZE_BITS.items():
+            args += [flag, str(bits)]
+        return args
+    
+    def _pack_args(self, quantize: bool, compress: bool) -> List[str]:
+        """gltfpack flags for the requested quantization and meshopt compression"""
+        # gltfpack quantizes by default; -noq keeps the float layout unless asked
+        args = self._quantize_args() if quantize else ["-noq"]
+        if compress:
+            # -cc: EXT_meshopt_compression with the higher-ratio filters
+            args.append("-cc")
+        return args
+    
+    def _quantize(self, glb_path: str) -> bool:
+        """Quantize vertex attributes in place with gltfpack; False if unavailable or failed."""
+        return self._gltfpack(glb_path, self._pack_args(True, False))
+    
+    def _quantize_builtin(self, glb_path: str) -> bool:
+        """Quantize in place with the numpy/pygltflib pass; False if unavailable or failed."""
+        try:
+            return _quantize_glb(glb_path)
+        except Exception as e:
+            # _quantize_glb only replaces the file after a full write, so the GLB is intact
+            logger.warning(f"Built-in quantization failed, keeping the float GLB: {e}")
             return False
     
-    def convert_to_web_format(self, input_path: str, output_dir: str) -> WebAssetsData:
-        """Convert to web-ready format"""
+    def _shrink(self, glb_path: str) -> bool:
+        """Shrink solids inward in place with the numpy pass; False if unavailable or failed."""
+        try:
+            return _shrink_glb(glb_path)
+        except Exception as e:
+            # _shrink_glb only replaces the file after a full write, so the GLB is intact
+            logger.warning(f"Shrink pass failed, keeping the unshrunk GLB: {e}")
+            return False
+    
+    def _simplify(self, glb_path: str, lod_path: str, ratio: float, quantize: bool,
+                  compress: bool = False) -> bool:
+        """Write a simplified copy of glb_path keeping ~ratio of the triangles to lod_path."""
+        args = ["-si", str(ratio)]
+        if SIMPLIFY_AGGRESSIVE:
+            args.append("-sa")
+        return self._gltfpack(glb_path, args + self._pack_args(quantize, compress), lod_path)
+    
+    def _reuse_existing(self, input_path: str, glb_path: str,
+                        web_assets: Optional[WebAssetsData] = None) -> bool:
+        """True if glb_path is at least as new as input_path; fills web_assets from it."""
+        # Skips the whole OCCT tessellation on re-runs. The quantize/compress options
+        # used for the existing file are not known here - pass force=True after changing them.
+        try:
+            glb_stat = os.stat(glb_path)
+            if glb_stat.st_mtime < os.stat(input_path).st_mtime:
+                return False
+        except FileNotFoundError:
+            return False
+        
+        if web_assets is not None:
+            web_assets.file_size = glb_stat.st_size
+            web_assets.format = "GLB"
+            web_assets.three_js_compatible = True
+            web_assets.reused = True
+        return True
+    
+    def convert_to_web_format(self, input_path: str, output_dir: str, quantize: bool = False,
+                              output_filename: str = "model.glb",
+                              simplify_ratio: Optional[float] = None,
+                              compress: bool = False, force: bool = False,
+                              isolate: bool = False, shrink: bool = False) -> WebAssetsData:
+        """Convert to web-ready format
+        
+        With quantize=True, vertex attributes are quantized (KHR_mesh_quantization), which
+        three.js loads natively - by gltfpack if it is on PATH, else by _quantize_glb.
+        With simplify_ratio (e.g. 0.5) and gltfpack on PATH, a simplified <stem>_lod1.glb
+        is written next to the full-detail GLB for the viewer to swap in at distance.
+        With compress=True and gltfpack on PATH, buffers are meshopt-compressed
+        (EXT_meshopt_compression); drei's useGLTF decodes them out of the box.
+        An existing GLB newer than the STEP file is reused as-is unless force=True.
+        With isolate=True, cascadio runs in a child process that Ctrl-C terminates.
+        With shrink=True, surfaces are pulled slightly inward (_shrink_glb) so overlapping
+        solids do not z-fight.
+        """
         web_assets = WebAssetsData()
         
-        if not self.cascadio_available:
+        glb_path = os.path.join(output_dir, output_filename)
+        if not force and self._reuse_existing(input_path, glb_path, web_assets):
+            web_assets.glb_file = output_filename
+            web_assets.glb_path = glb_path
+            if simplify_ratio:
+                stem, ext = os.path.splitext(output_filename)
+                lod_filename = f"{stem}_lod1{ext}"
+                if self._reuse_existing(input_path, os.path.join(output_dir, lod_filename)):
+                    web_assets.lod_files.append(lod_filename)
+            return web_assets
+        
+        if cascadio is None:
             web_assets.conversion_unavailable = "Cascadio not installed"
             return web_assets
         
         try:
-            import cascadio
-            
             # Create output directory if it doesn't exist
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+            os.makedirs(output_dir, exist_ok=True)
+            
+            _prefetch(input_path)
+            if isolate:
+                _step_to_glb_isolated(input_path, glb_path)
+            else:
+                cascadio.step_to_glb(input_path, glb_path)
+            
+            # Before simplify/quantize, which both expect float positions
+            if shrink:
+                self._shrink(glb_path)
+            
+            if simplify_ratio:
+                stem, ext = os.path.splitext(output_filename)
+                lod_filename = f"{stem}_lod1{ext}"
+                # Simplify from the float GLB before it is quantized below
+                if self._simplify(glb_path, os.path.join(output_dir, lod_filename),
+                                  simplify_ratio, quantize, compress):
+                    web_assets.lod_files.append(lod_filename)
             
-            glb_path = os.path.join(output_dir, "model.glb")
-            cascadio.step_to_glb(input_path, glb_path)
+            # Quantize and compress in one gltfpack call; meshopt compression needs gltfpack
+            if compress and self._gltfpack(glb_path, self._pack_args(quantize, True)):
+                web_assets.compression = "EXT_meshopt_compression"
+                web_assets.extensions.append("EXT_meshopt_compression")
+                if quantize:
+                    web_assets.extensions.append("KHR_mesh_quantization")
+            # gltfpack when installed, otherwise the built-in numpy/pygltflib pass
+            elif quantize and (self._quantize(glb_path) or self._quantize_builtin(glb_path)):
+                web_assets.extensions.append("KHR_mesh_quantization")
             
-            web_assets.glb_file = "model.glb"
-            web_assets.file_size = os.path.getsize(glb_path)
+            web_assets.glb_file = output_filename
+            web_assets.glb_path = glb_path
+            # cascadio only writes to a path (no bytes API), so one stat of the final file
+            # is the cheapest way to get its size; open+fstat would add syscalls
+            web_assets.file_size = os.stat(glb_path).st_size
             web_assets.format = "GLB"
             web_assets.three_js_compatible = True
             
         except Exception as e:
             web_assets.conversion_error = str(e)
+            # A partial GLB would be newer than the STEP file and reused next run
+            try:
+                os.remove(glb_path)
+            except OSError:
+                pass
         
         return web_assets
 
 
+def find_step_files_in_model_folder(model_folder="model"):
+    """Find all STEP files in the model folder, sorted by name"""
+    return find_step_files(model_folder)
+
+
 def find_step_file_in_model_folder():
     """Find STEP files in the model folder"""
-    model_folder = "model"
+    step_files = find_step_files_in_model_folder()
     
-    if not os.path.exists(model_folder):
-        return None
-    
-    # Look for STEP files with common extensions
-    step_extensions = ['*.step', '*.stp', '*.STEP', '*.STP']
-    step_files = []
-    
-    for extension in step_extensions:
-        step_files.extend(glob.glob(os.path.join(model_folder, extension)))
+    # Return the first STEP file by name
+    return step_files[0] if step_files else None
+
+
+def _convert_one(step_file, output_dir, output_filename):
+    """Process-pool entry point: convert one STEP file to <output_dir>/<output_filename>."""
+    return WebConverter().convert_to_web_format(step_file, output_dir, output_filename=output_filename)
+
+
+def convert_batch(step_files, output_dir="output/web", max_workers=None):
+    """Convert several STEP files in parallel processes; returns results in input order.
     
+    Each file becomes <output_dir>/<stem>.glb, with the extension added to the stem when
+    two files share it (a.step/a.stp).
+    """
     if not step_files:
-        return None
+        return []
+    
+    # cascadio never releases the GIL during OCCT tessellation, so threads would not overlap
+    max_workers = min(max_workers or os.cpu_count() or 1, len(step_files))
+    output_filenames = [f"{name}.glb" for name in output_names(step_files)]
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        results = list(executor.map(_convert_one, step_files,
+                                    [output_dir] * len(step_files), output_filenames))
+    except KeyboardInterrupt:
+        # Drop the queue and kill running conversions so main can report the cancel
+        terminate_executor(executor)
+        raise
     
-    # Return the first STEP file found
-    return step_files[0]
+    executor.shutdown()
+    return results
 
 
 def main():
@@ -92,14 +622,37 @@ def main():
     print("🔧 STEP to GLB Web Converter")
     print("=" * 40)
     
-    # Find STEP file in model folder
-    step_file = find_step_file_in_model_folder()
+    # Find STEP files in model folder
+    step_files = find_step_files_in_model_folder()
     
-    if not step_file:
+    if not step_files:
         print(f"❌ No STEP files found in '{model_folder}' folder")
         print(f"📁 Please place your STEP file (.stp or .step) in the '{model_folder}' directory")
         return 1
     
+    if len(step_files) > 1:
+        print(f"📂 Found {len(step_files)} STEP files, converting in parallel")
+        print(f"📁 Output directory: {output_dir}")
+        try:
+            results = convert_batch(step_files, output_dir)
+        except KeyboardInterrupt:
+            print("\n❌ Conversion cancelled by user")
+            return 1
+        
+        failed = 0
+        for step_file, result in zip(step_files, results):
+            error = result.conversion_error or result.conversion_unavailable
+            if error:
+                failed += 1
+                print(f"❌ {os.path.basename(step_file)}: {error}")
+            else:
+                status = "♻️  up to date" if result.reused else "✅"
+                print(f"{status} {os.path.basename(step_file)} -> {result.glb_path} "
+                      f"({result.file_size / (1024*1024):.2f} MB)")
+        return 1 if failed else 0
+    
+    step_file = step_files[0]
+    
     print(f"📂 Found STEP file: {step_file}")
     print(f"📁 Output directory: {output_dir}")
     
@@ -109,7 +662,7 @@ def main():
         
         # Create converter and convert
         converter = WebConverter()
-        result = converter.convert_to_web_format(step_file, output_dir)
+        result = converter.convert_to_web_format(step_file, output_dir, isolate=True)
         
         # Check results
         if result.conversion_error:
@@ -120,10 +673,13 @@ def main():
             print("💡 Install cascadio: pip install cascadio")
             return 1
         else:
-            print(f"✅ Conversion successful!")
+            if result.reused:
+                print(f"♻️  GLB is newer than the STEP file, skipped conversion")
+            else:
+                print(f"✅ Conversion successful!")
             print(f"📊 Conversion Summary:")
             print(f"• Input file: {step_file}")
-            print(f"• Output file: {os.path.join(output_dir, result.glb_file)}")
+            print(f"• Output file: {result.glb_path}")
             print(f"• File size: {result.file_size / (1024*1024):.2f} MB")
             print(f"• Format: {result.format}")
             print(f"• Three.js compatible: {result.three_js_compatible}")